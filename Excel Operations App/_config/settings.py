@@ -6,32 +6,56 @@
 import os
 import json
 import logging
-from typing import Dict, Any
+import threading
+from copy import deepcopy
+from typing import Dict, Any, Optional, Callable
+
+# Optional: C-accelerated JSON, falls back to the standard library
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Define the config path relative to the current working directory or absolute
 CONFIG_FILE = "config/config.json"
 
+# Delay (seconds) before pending changes are written to disk
+FLUSH_DELAY = 0.25
+
 # Initialize Logger
 logger = logging.getLogger('AppLogger')
 
+# In-memory state: the app is the only writer of the config file,
+# so the parsed dict is kept for the whole session
+_CACHE: Optional[Dict[str, Any]] = None
+_DIRTY = False
+_PENDING_WRITES = 0
+_FLUSH_TIMER: Optional[threading.Timer] = None
+_FLUSH_SCHEDULER: Optional[Callable[[int, Callable[[], None]], Any]] = None
+_LOCK = threading.RLock()
+
 # ==========================================
 # 2. CORE IO FUNCTIONS
 # ==========================================
 
-def load_config() -> Dict[str, Any]:
-    """Loads the configuration from the JSON file."""
+def _read_config_file() -> Dict[str, Any]:
+    """Reads and parses the JSON file from disk."""
     dir_path = os.path.dirname(CONFIG_FILE)
     
     # Create the directory if it doesn't exist
-    if dir_path and not os.path.exists(dir_path):
-        os.makedirs(dir_path)   
+    if dir_path:
+        os.makedirs(dir_path, exist_ok=True)
 
     # Check if the config file exists and load it
     if os.path.exists(CONFIG_FILE):
         try:
-            with open(CONFIG_FILE, 'r') as f:
-                logger.info("Config file loaded successfully.")
-                return json.load(f)
+            # Read the whole file in one call and parse the raw bytes
+            with open(CONFIG_FILE, 'rb') as f:
+                data = f.read()
+
+            config = orjson.loads(data) if orjson is not None else json.loads(data)
+            logger.info("Config file loaded successfully.")
+            return config
         except json.JSONDecodeError:
             logger.error("Config file is corrupted. Returning empty config.")
             return {}
@@ -40,83 +64,145 @@ def load_config() -> Dict[str, Any]:
     return {}
 
 
+def load_config() -> Dict[str, Any]:
+    """
+    Returns the configuration dictionary.
+    The file is only read on the first call, later calls are served from memory.
+    """
+    global _CACHE
+
+    with _LOCK:
+        if _CACHE is None:
+            _CACHE = _read_config_file()
+        return _CACHE
+
+
 def save_config(config: Dict[str, Any]) -> None:
-    """Saves the dictionary configuration to the JSON file."""
-    try:
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(config, f, indent=4) # Added indent for readability
-            logger.info("Config file saved successfully.")
-    except IOError as e:
-        logger.error(f"Failed to save config: {e}")
+    """
+    Updates the in-memory configuration and schedules a write to disk.
+    Saves made while a write is pending are collapsed into that write.
+    """
+    global _CACHE, _DIRTY, _PENDING_WRITES, _FLUSH_TIMER
+
+    with _LOCK:
+        _CACHE = config
+        _DIRTY = True
+        _PENDING_WRITES += 1
+
+        # A flush is already scheduled, it will pick up this change
+        if _PENDING_WRITES > 1:
+            return
+
+        if _FLUSH_SCHEDULER is not None:
+            _FLUSH_SCHEDULER(int(FLUSH_DELAY * 1000), flush_config)
+        else:
+            _FLUSH_TIMER = threading.Timer(FLUSH_DELAY, flush_config)
+            _FLUSH_TIMER.daemon = True
+            _FLUSH_TIMER.start()
+
+
+def set_flush_scheduler(scheduler: Callable[[int, Callable[[], None]], Any]) -> None:
+    """
+    Schedules delayed writes through the given function (e.g., app.after)
+    so they run on the GUI thread instead of a timer thread.
+    """
+    global _FLUSH_SCHEDULER
+    _FLUSH_SCHEDULER = scheduler
+
+
+def flush_config() -> None:
+    """Writes pending configuration changes to the JSON file."""
+    global _DIRTY, _PENDING_WRITES, _FLUSH_TIMER
+
+    with _LOCK:
+        if _FLUSH_TIMER is not None:
+            _FLUSH_TIMER.cancel()
+            _FLUSH_TIMER = None
+
+        pending_writes, _PENDING_WRITES = _PENDING_WRITES, 0
+
+        if not _DIRTY or _CACHE is None:
+            return
+
+        try:
+            # Serialize first, so a value JSON cannot hold never truncates the file
+            if orjson is not None:
+                data = orjson.dumps(_CACHE, option=orjson.OPT_INDENT_2)
+            else:
+                data = json.dumps(_CACHE, indent=4).encode('utf-8') # Added indent for readability
+
+            # Write a sibling file and swap it in, the old config stays intact on failure
+            temp_file = f"{CONFIG_FILE}.tmp"
+            with open(temp_file, 'wb') as f:
+                f.write(data)
+            os.replace(temp_file, CONFIG_FILE)
+
+            logger.info(f"Config file saved successfully ({pending_writes} change(s)).")
+            _DIRTY = False
+        except (OSError, TypeError, ValueError) as e:
+            # orjson.JSONEncodeError is a TypeError
+            logger.error(f"Failed to save config: {e}")
 
 
 # ==========================================
 # 3. SERVICE CONFIGURATION MANAGEMENT
 # ==========================================
 
-def clear_service_one_config() -> None:
-    """Resets configuration for Service One."""
-    config = load_config()
-
-    # Ensure keys exist before clearing to avoid KeyError if config is empty
-    if "service_one" not in config:
-        config["service_one"] = {}
-
-    config["service_one"]["file1"] = {
+# Cleared state of each service section
+_SERVICE_ONE_DEFAULTS: Dict[str, Any] = {
+    "file1": {
         "file_path": "",
         "sheet_name": "",
         "unique_id_column": "",
         "forecast_column": "",
         "extra_columns": []
-    }
-    config["service_one"]["file2"] = {
+    },
+    "file2": {
         "file_path": "",
         "sheet_name": "",
         "unique_id_column": "",
         "forecast_column": ""
     }
+}
 
-    logger.info("Config for service_one cleared")
-    save_config(config)
-
-
-def clear_service_two_config() -> None:
-    """Resets configuration for Service Two."""
-    config = load_config()
-
-    if "service_two" not in config:
-        config["service_two"] = {}
-
-    # Fixed: Now correctly targets service_two instead of service_one
-    config["service_two"]["file1"] = {
+_SERVICE_TWO_DEFAULTS: Dict[str, Any] = {
+    "file1": {
         "file_path": "",
         "sheet_name": "",
-    }
-    config["service_two"]["file2"] = {
+    },
+    "file2": {
         "file_path": "",
         "sheet_name": "",
-    }
-    config["service_two"]["unique_id_column"] = ""
-    config["service_two"]["compare_columns"] = []
-
-    logger.info("Config for service_two cleared")
-    save_config(config)
+    },
+    "unique_id_column": "",
+    "compare_columns": []
+}
+
+_SERVICE_EIGHT_DEFAULTS: Dict[str, Any] = {
+    "file_paths": [],
+    "sheet_names": [],
+    "merging_columns": [],
+    "selected_columns": []
+}
+
+
+def clear_service_one_config(config: Dict[str, Any]) -> None:
+    """Resets configuration for Service One in place (no disk I/O)."""
+    # Copy so later edits of the config never reach the defaults
+    config.setdefault("service_one", {}).update(deepcopy(_SERVICE_ONE_DEFAULTS))
+    logger.info("Config for service_one cleared")
 
 
-def clear_service_eight_config() -> None:
-    """Resets configuration for Service Eight."""
-    config = load_config()
+def clear_service_two_config(config: Dict[str, Any]) -> None:
+    """Resets configuration for Service Two in place (no disk I/O)."""
+    config.setdefault("service_two", {}).update(deepcopy(_SERVICE_TWO_DEFAULTS))
+    logger.info("Config for service_two cleared")
 
-    if "service_eight" not in config:
-        config["service_eight"] = {}
 
-    config["service_eight"]["file_paths"] = []
-    config["service_eight"]["sheet_names"] = []
-    config["service_eight"]["merging_columns"] = []
-    config["service_eight"]["selected_columns"] = []
-    
+def clear_service_eight_config(config: Dict[str, Any]) -> None:
+    """Resets configuration for Service Eight in place (no disk I/O)."""
+    config.setdefault("service_eight", {}).update(deepcopy(_SERVICE_EIGHT_DEFAULTS))
     logger.info("Config for service_eight cleared")
-    save_config(config)
 
 
 # ==========================================
@@ -125,9 +211,16 @@ def clear_service_eight_config() -> None:
 
 def terminate_program() -> None:
     """Clears all temporary configurations before exit."""
-    clear_service_one_config()
-    clear_service_two_config()
-    clear_service_eight_config()
+    config = load_config()
+
+    clear_service_one_config(config)
+    clear_service_two_config(config)
+    clear_service_eight_config(config)
+
+    save_config(config)
+
+    # Write immediately instead of waiting on the timer
+    flush_config()
 
 
 def pretty_print_config(service: str) -> None:
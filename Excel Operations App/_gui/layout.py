@@ -16,6 +16,9 @@ from _gui.monitor import setup_monitor
 # Constants
 ICON_PATH = "inputs/Microsoft.ico" 
 
+# The icon does not come and go during a session, check for it once
+_ICON_EXISTS = os.path.isfile(ICON_PATH)
+
 # ==========================================
 # 2. LOADING SCREENS
 # ==========================================
@@ -27,7 +30,7 @@ def show_loading_screen(app: ctk.CTk) -> ctk.CTkToplevel:
     loading_screen.geometry("300x100")
     
     # Safe icon loading
-    if os.path.exists(ICON_PATH):
+    if _ICON_EXISTS:
         loading_screen.iconbitmap(ICON_PATH)
         
     loading_label = ctk.CTkLabel(
@@ -53,7 +56,7 @@ def show_loading_screen_in() -> tk.Toplevel:
     loading_screen.configure(bg='#333333')
 
     # Safe icon loading
-    if os.path.exists(ICON_PATH):
+    if _ICON_EXISTS:
         loading_screen.iconbitmap(ICON_PATH)
 
     label = tk.Label(
@@ -103,12 +106,6 @@ def show_loading_screen_in() -> tk.Toplevel:
 def setup_default_layout(left_frame: ctk.CTkFrame, right_frame: ctk.CTkFrame) -> None:
     """Initializes the main navigation menu and default view."""
     
-    # Delayed imports to avoid circular dependencies
-    from _gui.service_one_layout import setup_service_one
-    from _gui.service_two_layout import setup_service_two
-    from _gui.service_eight_layout import setup_service_eight
-    from _gui.service_three_layout import setup_service_three
-    
     # Clear the frames to ensure a clean slate
     clear_frame(left_frame)
     clear_frame(right_frame)
@@ -119,6 +116,28 @@ def setup_default_layout(left_frame: ctk.CTkFrame, right_frame: ctk.CTkFrame) ->
     # Optional: Log the welcome message if needed
     # print(welcome_message) 
 
+    # ------------------------------------------
+    # Service Openers
+    # ------------------------------------------
+    # Service layouts are imported on first click: this avoids circular
+    # dependencies and keeps pandas/matplotlib out of application startup
+
+    def open_service_eight() -> None:
+        from _gui.service_eight_layout import setup_service_eight
+        setup_service_eight(left_frame, right_frame)
+
+    def open_service_one() -> None:
+        from _gui.service_one_layout import setup_service_one
+        setup_service_one(left_frame, right_frame)
+
+    def open_service_two() -> None:
+        from _gui.service_two_layout import setup_service_two
+        setup_service_two(left_frame, right_frame)
+
+    def open_service_three() -> None:
+        from _gui.service_three_layout import setup_service_three
+        setup_service_three(left_frame, right_frame)
+
     # ------------------------------------------
     # Navigation Buttons (Left Frame)
     # ------------------------------------------
@@ -127,7 +146,7 @@ def setup_default_layout(left_frame: ctk.CTkFrame, right_frame: ctk.CTkFrame) ->
     service8_button = ctk.CTkButton(
         master=left_frame, 
         text="Merge Excels", 
-        command=lambda: setup_service_eight(left_frame, right_frame)
+        command=open_service_eight
     )
     service8_button.pack(padx=10, pady=10)
     
@@ -135,7 +154,7 @@ def setup_default_layout(left_frame: ctk.CTkFrame, right_frame: ctk.CTkFrame) ->
     service1_button = ctk.CTkButton(
         master=left_frame, 
         text="Forecast Comparison", 
-        command=lambda: setup_service_one(left_frame, right_frame)
+        command=open_service_one
     )
     service1_button.pack(padx=10, pady=10)
     
@@ -143,7 +162,7 @@ def setup_default_layout(left_frame: ctk.CTkFrame, right_frame: ctk.CTkFrame) ->
     service2_button = ctk.CTkButton(
         master=left_frame, 
         text="Detect Changes", 
-        command=lambda: setup_service_two(left_frame, right_frame)
+        command=open_service_two
     )
     service2_button.pack(padx=10, pady=10)
     
@@ -151,6 +170,6 @@ def setup_default_layout(left_frame: ctk.CTkFrame, right_frame: ctk.CTkFrame) ->
     service3_button = ctk.CTkButton(
         master=left_frame, 
         text="Service Usage Report", 
-        command=lambda: setup_service_three(left_frame, right_frame)
+        command=open_service_three
     )
-    service3_button.pack(padx=10, pady=10)
+    service3_button.pack(padx=10, pady=10)
\ No newline at end of file
@@ -4,8 +4,16 @@
 
 # Third-Party Libraries
 import sys
+from collections import deque
+from typing import Deque
 import customtkinter as ctk
 
+# Interval (ms) at which the Tk thread moves buffered output into the monitor
+MONITOR_POLL_MS = 50
+
+# Lines kept in the monitor, older lines are dropped from the top
+MONITOR_MAX_LINES = 5000
+
 # ==========================================
 # 2. CLASSES
 # ==========================================
@@ -14,19 +22,54 @@ class MonitorRedirector:
     """
     A class to redirect sys.stdout and sys.stderr to a generic
     CustomTkinter text widget, creating an internal console.
+    Writes may come from any thread and are only buffered; the Tk thread
+    moves them into the widget from a recurring 'after' poll.
+    Nothing is dropped between flushes; the widget itself keeps the
+    last 'MONITOR_MAX_LINES' lines.
     """
     def __init__(self, output_widget: ctk.CTkTextbox):
         self.output_widget = output_widget
+        self._buf: Deque[str] = deque()
+
+        # Created on the Tk thread, so the poll runs there too. It is scheduled
+        # on the window, which outlives the widget when services are switched.
+        self._window = output_widget.winfo_toplevel()
+        self._window.after(MONITOR_POLL_MS, self._poll)
     
     def write(self, text: str) -> None:
-        """Writes text to the widget and scrolls to the bottom."""
-        self.output_widget.insert('end', text)
+        """Buffers text. No Tk call is made, so any thread may print."""
+        self._buf.append(text)
+
+    def _poll(self) -> None:
+        """Flushes the buffer and re-arms itself while the widget exists."""
+        # The widget is gone if the user switched to another service
+        if not self.output_widget.winfo_exists():
+            return
+
+        self._flush()
+        self._window.after(MONITOR_POLL_MS, self._poll)
+
+    def _flush(self) -> None:
+        """Writes the buffered text to the widget and scrolls to the bottom."""
+        # Drain with popleft, which stays safe while worker threads append
+        chunks = [self._buf.popleft() for _ in range(len(self._buf))]
+
+        if not chunks:
+            return
+
+        self.output_widget.insert('end', "".join(chunks))
+
+        # Trim the oldest lines so a long session does not grow without bound
+        line_count = int(self.output_widget.index('end-1c').split('.')[0])
+        if line_count > MONITOR_MAX_LINES:
+            self.output_widget.delete('1.0', f'{line_count - MONITOR_MAX_LINES + 1}.0')
+
         self.output_widget.see('end')
 
     def flush(self) -> None:
         """
         Required method for file-like objects (sys.stdout).
-        Left empty as GUI updates happen immediately in 'write'.
+        Left empty as the widget is updated on the next poll.
         """
         pass
 
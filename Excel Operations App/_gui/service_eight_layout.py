@@ -3,14 +3,15 @@
 # ==========================================
 
 # Third-Party Libraries
+import os
 import logging
-import pandas as pd
+from typing import List, Tuple
 import customtkinter as ctk
 from tkinter import filedialog
 
 # Local Imports
 from _config.settings import load_config, save_config
-from _utils.functions import clear_frame
+from _utils.functions import clear_frame, fast_sheet_names, read_header_only, release_workbooks, run_in_background
 from _gui.monitor import setup_monitor
 
 # Service Specific Imports
@@ -20,6 +21,12 @@ from _service_eight.service_constants import entry_message
 # Initialize Logger
 logger = logging.getLogger('AppLogger')
 
+# Column checkboxes of the current preview, stored as (column_name, checkbox)
+column_checkboxes: List[Tuple[str, ctk.CTkCheckBox]] = []
+
+# Grid options shared by every widget stacked in the left frame
+LEFT_FRAME_GRID = {"column": 0, "columnspan": 2, "pady": 10, "padx": 10, "sticky": "ew"}
+
 # ==========================================
 # 2. SELECTION LOGIC
 # ==========================================
@@ -38,12 +45,18 @@ def select_files(button: ctk.CTkButton, frame: ctk.CTkFrame) -> None:
     )
 
     if selected_files:
+        # Normalize once: plain list (not a Tcl tuple) with OS-native separators
+        selected_files = [os.path.normpath(path) for path in selected_files]
+
         # Update Config
         config["service_eight"]["file_paths"] = selected_files
         # Initialize sheet_names with empty strings
         config["service_eight"]["sheet_names"] = [""] * len(selected_files)
         save_config(config)
 
+        # Forget cached rows of the previous selection
+        release_workbooks(keep=selected_files)
+
         # Clear previous widgets in the frame if any
         clear_frame(frame)
 
@@ -52,9 +65,8 @@ def select_files(button: ctk.CTkButton, frame: ctk.CTkFrame) -> None:
             print(f" - {file_path}")
             
             try:
-                # Read Excel file to get sheet names
-                excel_file = pd.ExcelFile(file_path, engine='openpyxl')
-                sheet_names = excel_file.sheet_names
+                # Read sheet names only (workbook contents are not loaded)
+                sheet_names = fast_sheet_names(file_path)
 
                 # Create Label
                 label = ctk.CTkLabel(frame, text=f"File {index + 1} Sheet:")
@@ -62,16 +74,15 @@ def select_files(button: ctk.CTkButton, frame: ctk.CTkFrame) -> None:
 
                 # Create Dropdown
                 var = ctk.StringVar()
-                dropdown = ctk.CTkComboBox(frame, values=sheet_names, variable=var)
+                dropdown = ctk.CTkComboBox(frame, values=tuple(sheet_names), variable=var)
                 dropdown.grid(row=index, column=1, padx=5, pady=5, sticky='ew')
 
                 # Define callback for this specific dropdown
                 def on_sheet_select(choice: str, idx: int = index) -> None:
                     print(f"Selected file {idx + 1} sheet: {choice}")
-                    # Reload config to ensure we don't overwrite other updates
-                    current_config = load_config() 
-                    current_config["service_eight"]["sheet_names"][idx] = choice
-                    save_config(current_config)
+                    # 'config' is the shared in-memory config, no need to reload it
+                    config["service_eight"]["sheet_names"][idx] = choice
+                    save_config(config)
 
                 dropdown.configure(command=on_sheet_select)
             
@@ -105,9 +116,8 @@ def create_column_dropdowns(frame: ctk.CTkFrame) -> None:
             continue
 
         try:
-            # Read header only to get columns (efficient)
-            df = pd.read_excel(file_path, sheet_name=sheet_name, engine='openpyxl', nrows=0)
-            column_names = df.columns.tolist()
+            # Read the first row only (cached between clicks while the file is unchanged)
+            column_names = read_header_only(file_path, sheet_name)
 
             # Create Label
             column_label = ctk.CTkLabel(frame, text=f"File {index + 1} Key Column:")
@@ -115,15 +125,15 @@ def create_column_dropdowns(frame: ctk.CTkFrame) -> None:
 
             # Create Dropdown
             column_var = ctk.StringVar()
-            column_dropdown = ctk.CTkComboBox(frame, values=column_names, variable=column_var)
+            column_dropdown = ctk.CTkComboBox(frame, values=tuple(column_names), variable=column_var)
             column_dropdown.grid(row=index + row_offset, column=1, padx=5, pady=5, sticky='ew')
 
             # Define callback
+            # The choice is stored as text, service_merge() maps it back to the sheet's label
             def on_column_select(choice: str, idx: int = index) -> None:
                 print(f"Selected file {idx + 1} merge column: {choice}")
-                current_config = load_config()
-                current_config["service_eight"]["merging_columns"][idx] = choice
-                save_config(current_config)
+                config["service_eight"]["merging_columns"][idx] = choice
+                save_config(config)
 
             column_dropdown.configure(command=on_column_select)
 
@@ -142,6 +152,7 @@ def display_column_checkboxes(frame: ctk.CTkFrame) -> None:
     checkboxes for the user to select which columns to keep.
     """
     clear_frame(frame)
+    column_checkboxes.clear()
     
     try:
         print("Analyzing merged data structure...")
@@ -157,6 +168,7 @@ def display_column_checkboxes(frame: ctk.CTkFrame) -> None:
         for col in merged_columns:
             checkbox = ctk.CTkCheckBox(frame, text=col)
             checkbox.pack(padx=10, pady=5, anchor='w')
+            column_checkboxes.append((str(col), checkbox))
             
     except Exception as e:
         logger.error(f"Merge failed: {e}")
@@ -166,16 +178,15 @@ def display_column_checkboxes(frame: ctk.CTkFrame) -> None:
 def get_selected_checkboxes(checkbox_frame: ctk.CTkFrame) -> None:
     """
     Retrieves selected columns from checkboxes, updates config, 
-    and triggers the final save to Excel.
+    and triggers the final save to Excel in a background thread.
     """
+    # Delayed import to avoid circular dependency
+    from _gui.layout import show_loading_screen_in
+
     config = load_config()
-    selected_columns = []
-    
-    # Iterate through children widgets to find checked boxes
-    for widget in checkbox_frame.winfo_children():
-        if isinstance(widget, ctk.CTkCheckBox):
-            if widget.get() == 1:  # CheckBox value is 1 if checked
-                selected_columns.append(widget.cget("text")) 
+
+    # Use the tracked checkboxes instead of walking the frame's children
+    selected_columns = [name for name, checkbox in column_checkboxes if checkbox.get()]
                 
     config["service_eight"]["selected_columns"] = selected_columns
     save_config(config)
@@ -184,8 +195,21 @@ def get_selected_checkboxes(checkbox_frame: ctk.CTkFrame) -> None:
     for column in selected_columns:
         print(f"- {column}")
         
-    # Perform final save
-    save_to_excel(service_merge())
+    # Perform final save off the Tk thread so the loading screen keeps animating.
+    # The loading screen polls for the result, and is closed on the Tk thread.
+    loading_screen = show_loading_screen_in()
+
+    def on_error(e: Exception) -> None:
+        logger.error(f"Save failed: {e}")
+        print(f"Save process failed: {e}")
+        loading_screen.destroy()
+
+    run_in_background(
+        loading_screen,
+        lambda: save_to_excel(service_merge()),
+        lambda _: loading_screen.destroy(),
+        on_error
+    )
 
 
 # ==========================================
@@ -200,6 +224,7 @@ def setup_service_eight(left_frame: ctk.CTkFrame, right_frame: ctk.CTkFrame) ->
     # Clean slate
     clear_frame(left_frame)
     clear_frame(right_frame)
+    column_checkboxes.clear()
 
     # Delayed import to avoid circular dependency
     from _gui.layout import setup_default_layout
@@ -212,7 +237,7 @@ def setup_service_eight(left_frame: ctk.CTkFrame, right_frame: ctk.CTkFrame) ->
         text="< Main Menu", 
         command=lambda: setup_default_layout(left_frame, right_frame)
     )
-    switch_button.grid(row=0, column=0, columnspan=2, pady=10, padx=10, sticky="ew")
+    switch_button.grid(row=0, **LEFT_FRAME_GRID)
 
     # ---------------------------
     # Monitor Setup
@@ -230,7 +255,6 @@ def setup_service_eight(left_frame: ctk.CTkFrame, right_frame: ctk.CTkFrame) ->
         text="1. Select Files", 
         command=lambda: select_files(file_button, dropdown_frame)
     )
-    file_button.grid(row=1, column=0, columnspan=2, pady=10, padx=10, sticky="ew")
 
     # Column Selection Button
     column_button = ctk.CTkButton(
@@ -238,11 +262,9 @@ def setup_service_eight(left_frame: ctk.CTkFrame, right_frame: ctk.CTkFrame) ->
         text="2. Select Merge Keys", 
         command=lambda: create_column_dropdowns(dropdown_frame)
     )
-    column_button.grid(row=2, column=0, columnspan=2, pady=10, padx=10, sticky="ew")
     
     # Scrollable Area for Dropdowns (Sheets & Columns)
     dropdown_frame = ctk.CTkScrollableFrame(left_frame, height=200)
-    dropdown_frame.grid(row=3, column=0, columnspan=2, pady=10, padx=10, sticky="ew")
     
     # Merge Preview Button
     merge_button = ctk.CTkButton(
@@ -250,11 +272,9 @@ def setup_service_eight(left_frame: ctk.CTkFrame, right_frame: ctk.CTkFrame) ->
         text="3. Analyze & Filter", 
         command=lambda: display_column_checkboxes(checkbox_frame)
     )
-    merge_button.grid(row=4, column=0, columnspan=2, pady=10, padx=10, sticky="ew")
 
     # Scrollable Area for Column Checkboxes
     checkbox_frame = ctk.CTkScrollableFrame(left_frame, height=200)
-    checkbox_frame.grid(row=5, column=0, columnspan=2, pady=10, padx=10, sticky="ew")
 
     # Final Save Button
     confirm_button = ctk.CTkButton(
@@ -264,7 +284,11 @@ def setup_service_eight(left_frame: ctk.CTkFrame, right_frame: ctk.CTkFrame) ->
         hover_color="darkgreen",
         command=lambda: get_selected_checkboxes(checkbox_frame)
     )
-    confirm_button.grid(row=6, column=0, columnspan=2, pady=10, padx=10, sticky="ew")
+
+    # Stack the components below the navigation button, in order
+    components = (file_button, column_button, dropdown_frame, merge_button, checkbox_frame, confirm_button)
+    for row, widget in enumerate(components, start=1):
+        widget.grid(row=row, **LEFT_FRAME_GRID)
     
     # Grid Configuration
     left_frame.grid_columnconfigure(0, weight=1)
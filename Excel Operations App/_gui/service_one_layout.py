@@ -3,15 +3,15 @@
 # ==========================================
 
 # Third-Party Libraries
+import os
 import logging
-from typing import List, Optional
-import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple
 import customtkinter as ctk
 from tkinter import filedialog
 
 # Local Imports
 from _config.settings import load_config, save_config, pretty_print_config
-from _utils.functions import clear_frame, auto_header_finder
+from _utils.functions import clear_frame, auto_header_finder, load_sheet_names_async, read_header_only, release_workbooks
 from _gui.monitor import setup_monitor
 
 # Service Specific Imports
@@ -21,6 +21,18 @@ from _service_one.service_constants import entry_message
 # Initialize Logger
 logger = logging.getLogger('AppLogger')
 
+# Columns hidden from the dropdowns (internal columns)
+EXCLUDED_COLUMNS = frozenset(("Subregion",))
+
+# Config keys of the input files, indexed by file_index - 1
+_FILE_KEYS = ("file1", "file2")
+
+
+def _file_config(config: Dict[str, Any], file_index: int) -> Dict[str, Any]:
+    """Returns the config section of an input file (created if missing)."""
+    return config["service_one"].setdefault(_FILE_KEYS[file_index - 1], {})
+
+
 # ==========================================
 # 2. FILE & SHEET SELECTION LOGIC
 # ==========================================
@@ -31,27 +43,30 @@ def select_file(button: ctk.CTkButton, dropdown: ctk.CTkComboBox, file_index: in
     file_path = filedialog.askopenfilename(title=f"Select Excel file {file_index}")
     
     if file_path:
-        try:
-            # Read the excel file and get sheet names
-            excel_file = pd.ExcelFile(file_path, engine='openpyxl')
-            sheet_names_list = excel_file.sheet_names
-
-            # Update the dropdown menu with sheet names
-            dropdown.configure(values=sheet_names_list)
-            dropdown.set("Select sheet")
-
-            # Update Button Text
-            file_name = file_path.split("/")[-1]
-            button.configure(text=f"Selected file: {file_name}")
-            print(f"File {file_index} is set to: {file_name}")
-
-            # Save to config
-            config["service_one"][f"file{file_index}"]["file_path"] = file_path
-            save_config(config)
+        def on_sheets_loaded(sheet_names_list: List[str]) -> None:
+            try:
+                # Update the dropdown menu with sheet names
+                dropdown.configure(values=tuple(sheet_names_list))
+                dropdown.set("Select sheet")
+
+                # Update Button Text
+                file_name = os.path.basename(file_path)
+                button.configure(text=f"Selected file: {file_name}")
+                print(f"File {file_index} is set to: {file_name}")
+
+                # Save to config
+                _file_config(config, file_index)["file_path"] = file_path
+                save_config(config)
+
+                # Forget cached rows of files no longer referenced by the config
+                release_workbooks(keep=[data["file_path"] for data in config["service_one"].values()])
             
-        except Exception as e:
-            logger.error(f"Failed to load file {file_path}: {e}")
-            print(f"Error loading file: {e}")
+            except Exception as e:
+                logger.error(f"Failed to load file {file_path}: {e}")
+                print(f"Error loading file: {e}")
+
+        # Read sheet names off the Tk thread (workbook contents are not loaded)
+        load_sheet_names_async(button, file_path, on_sheets_loaded)
 
 
 def handle_dropdown_selection(selected_sheet: str, 
@@ -63,24 +78,23 @@ def handle_dropdown_selection(selected_sheet: str,
     Loads headers from the selected sheet and populates column dropdowns.
     """
     config = load_config()
+    file_data = _file_config(config, file_index)
     
     # Store the selected sheet name
-    config["service_one"][f"file{file_index}"]["sheet_name"] = selected_sheet
+    file_data["sheet_name"] = selected_sheet
     save_config(config)
     print(f"File {file_index} selected sheet is set to: {selected_sheet}")
 
     # Load the selected file's sheet
-    file_data = config["service_one"][f"file{file_index}"]
-
-    if file_data and file_data.get("file_path"):
+    if file_data.get("file_path"):
         try:
-            # Initial read to find header
+            # Initial read to find header, then stream that row only
             header_row = auto_header_finder(file_data)
-            df = pd.read_excel(file_data["file_path"], sheet_name=selected_sheet, header=header_row)
+            column_names = read_header_only(file_data["file_path"], selected_sheet, header_row)
 
             # Populate column dropdowns
             filtered_columns = populate_column_dropdowns(
-                df, unique_id_dropdown, forecast_dropdown, extra_columns_dropdown, file_index
+                column_names, unique_id_dropdown, forecast_dropdown, extra_columns_dropdown, file_index
             )
             
         except Exception as e:
@@ -92,23 +106,24 @@ def handle_dropdown_selection(selected_sheet: str,
 # 3. COLUMN HANDLING LOGIC
 # ==========================================
 
-def populate_column_dropdowns(df: pd.DataFrame, 
+def populate_column_dropdowns(column_names: List[Any], 
                               unique_id_dropdown: ctk.CTkComboBox, 
                               forecast_dropdown: ctk.CTkComboBox, 
                               extra_columns_dropdown: Optional[ctk.CTkComboBox], 
-                              file_index: int) -> List[str]:
+                              file_index: int) -> Tuple[Any, ...]:
     """Filters columns and updates dropdown widgets."""
     config = load_config()
-    
-    # Get the column names (headers)
-    col_names = sorted(list(df.columns))
-    excluded_columns = ["Subregion"] # Logic to exclude specific internal columns
+    file_data = _file_config(config, file_index)
     
     # Get the already selected extra columns from the config
-    selected_extra_columns = config["service_one"][f"file{file_index}"].get("extra_columns", [])
+    # Column names are stored as text, analyse() maps them back to the sheet's labels
+    extras = frozenset(map(str, file_data.get("extra_columns", [])))
 
     # Filter columns
-    filtered_columns = [col for col in col_names if col not in excluded_columns and col not in selected_extra_columns]
+    filtered_columns = tuple(sorted(
+        (col for col in column_names if col not in EXCLUDED_COLUMNS and str(col) not in extras),
+        key=str
+    ))
 
     # Update standard dropdowns
     unique_id_dropdown.configure(values=filtered_columns)
@@ -126,19 +141,17 @@ def select_extra_columns(extra_column: str, extra_columns_dropdown: ctk.CTkCombo
     config = load_config()
 
     if extra_column:
-        selected_extra_columns = config["service_one"][f"file{file_index}"].get("extra_columns", [])
+        selected_extra_columns = _file_config(config, file_index).setdefault("extra_columns", [])
 
         if extra_column not in selected_extra_columns:
             selected_extra_columns.append(extra_column)
-            
-            config["service_one"][f"file{file_index}"]["extra_columns"] = selected_extra_columns
             save_config(config)
             
             print(f"Selected Extra Columns: {', '.join(selected_extra_columns)}")
 
     # Update dropdown to remove selected item
-    current_values = list(extra_columns_dropdown.cget('values'))
-    new_values = [col for col in current_values if col != extra_column]
+    current_values = extra_columns_dropdown.cget('values')
+    new_values = tuple(col for col in current_values if str(col) != extra_column)
     extra_columns_dropdown.configure(values=new_values)
     extra_columns_dropdown.set("Select more columns")
 
@@ -146,7 +159,7 @@ def select_extra_columns(extra_column: str, extra_columns_dropdown: ctk.CTkCombo
 def clear_extra_columns(file_index: int = 1) -> None:
     """Clears the extra column selection in config."""
     config = load_config()
-    config["service_one"][f"file{file_index}"]["extra_columns"] = []
+    _file_config(config, file_index)["extra_columns"] = []
     save_config(config)
     print("Cleared all selected extra columns")
 
@@ -156,11 +169,13 @@ def confirm_inputs(unique_id_dropdown1: ctk.CTkComboBox, forecast_dropdown1: ctk
     """Validates and saves the final column mappings."""
     config = load_config()
 
-    config["service_one"]["file1"]["unique_id_column"] = unique_id_dropdown1.get()
-    config["service_one"]["file1"]["forecast_column"] = forecast_dropdown1.get()
+    file1_data = _file_config(config, 1)
+    file1_data["unique_id_column"] = unique_id_dropdown1.get()
+    file1_data["forecast_column"] = forecast_dropdown1.get()
 
-    config["service_one"]["file2"]["unique_id_column"] = unique_id_dropdown2.get()
-    config["service_one"]["file2"]["forecast_column"] = forecast_dropdown2.get()
+    file2_data = _file_config(config, 2)
+    file2_data["unique_id_column"] = unique_id_dropdown2.get()
+    file2_data["forecast_column"] = forecast_dropdown2.get()
 
     save_config(config)
     
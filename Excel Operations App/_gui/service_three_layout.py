@@ -5,13 +5,13 @@
 # Third-Party Libraries
 import os
 import logging
-import pandas as pd
 import customtkinter as ctk
 from tkinter import filedialog, ttk
+from typing import List
 
 # Local Imports
 from _config.settings import load_config, save_config
-from _utils.functions import clear_frame
+from _utils.functions import clear_frame, load_sheet_names_async
 from _gui.monitor import setup_monitor
 
 # Service Specific Imports
@@ -33,27 +33,27 @@ def select_file(button: ctk.CTkButton, dropdown: ctk.CTkComboBox) -> None:
     file_path = filedialog.askopenfilename(title="Select Usage Report File")
     
     if file_path:
-        try:
-            # Load Excel metadata
-            excel_file = pd.ExcelFile(file_path, engine='openpyxl')
-            sheet_names_list = excel_file.sheet_names
-            
-            # Update Dropdown
-            dropdown.configure(values=sheet_names_list)
-            dropdown.set("Select sheet")
-
-            # Update Button Text
-            file_name = os.path.basename(file_path)
-            button.configure(text=f"Selected file: {file_name}")
-            print(f"Usage report file set to: {file_name}")
-
-            # Save to Config
-            config["service_three"]["file_path"] = file_path
-            save_config(config)
-
-        except Exception as e:
-            logger.error(f"Failed to load file {file_path}: {e}")
-            print(f"Error loading file: {e}")
+        def on_sheets_loaded(sheet_names_list: List[str]) -> None:
+            try:
+                # Update Dropdown
+                dropdown.configure(values=tuple(sheet_names_list))
+                dropdown.set("Select sheet")
+
+                # Update Button Text
+                file_name = os.path.basename(file_path)
+                button.configure(text=f"Selected file: {file_name}")
+                print(f"Usage report file set to: {file_name}")
+
+                # Save to Config
+                config["service_three"]["file_path"] = file_path
+                save_config(config)
+
+            except Exception as e:
+                logger.error(f"Failed to load file {file_path}: {e}")
+                print(f"Error loading file: {e}")
+
+        # Read sheet names off the Tk thread (workbook contents are not loaded)
+        load_sheet_names_async(button, file_path, on_sheets_loaded)
 
 
 def handle_sheet_selection(selected_sheet: str) -> None:
@@ -5,14 +5,13 @@
 # Third-Party Libraries
 import os
 import logging
-import pandas as pd
 import customtkinter as ctk
 from tkinter import filedialog
-from typing import Dict
+from typing import Any, Dict, List, Tuple
 
 # Local Imports
 from _config.settings import load_config, save_config
-from _utils.functions import clear_frame
+from _utils.functions import clear_frame, load_sheet_names_async, read_header_only, release_workbooks, run_in_background
 from _gui.monitor import setup_monitor
 
 # Service Specific Imports
@@ -22,8 +21,17 @@ from _service_two.service_constants import entry_message
 # Initialize Logger
 logger = logging.getLogger('AppLogger')
 
-# Global storage for checkbox variables to ensure persistence between clicks
-checkbox_vars: Dict[str, ctk.BooleanVar] = {}
+# Global storage for the column checkboxes to ensure persistence between clicks.
+# The checked state is mirrored in 'checked_bits' so saving needs no Tcl calls.
+column_names: List[Any] = []
+checked_bits = bytearray()
+column_checkboxes: List[ctk.CTkCheckBox] = []
+
+# Number of column checkboxes created per idle callback
+CHECKBOX_BATCH_SIZE = 50
+
+# Last (file_path, sheet_name) loaded per file index, to skip reselections
+_last_selection: Dict[int, Tuple[str, str]] = {}
 
 # ==========================================
 # 2. SELECTION LOGIC
@@ -35,27 +43,30 @@ def select_file(button: ctk.CTkButton, dropdown: ctk.CTkComboBox, file_index: in
     file_path = filedialog.askopenfilename(title=f"Select Excel file {file_index}")
     
     if file_path:
-        try:
-            # Read the excel file and get sheet names
-            excel_file = pd.ExcelFile(file_path, engine='openpyxl')
-            sheet_names_list = excel_file.sheet_names
+        def on_sheets_loaded(sheet_names_list: List[str]) -> None:
+            try:
+                # Update the dropdown menu with sheet names
+                dropdown.configure(values=tuple(sheet_names_list))
+                dropdown.set("Select sheet")
+
+                # Update Button Text safely
+                file_name = os.path.basename(file_path)
+                button.configure(text=f"Selected file: {file_name}")
+                print(f"File {file_index} is set to: {file_name}")
+
+                # Save to config
+                config["service_two"][f"file{file_index}"]["file_path"] = file_path
+                save_config(config)
+
+                # Forget cached rows of files no longer referenced by the config
+                release_workbooks(keep=[config["service_two"][key]["file_path"] for key in ("file1", "file2")])
             
-            # Update the dropdown menu with sheet names
-            dropdown.configure(values=sheet_names_list)
-            dropdown.set("Select sheet")
-
-            # Update Button Text safely
-            file_name = os.path.basename(file_path)
-            button.configure(text=f"Selected file: {file_name}")
-            print(f"File {file_index} is set to: {file_name}")
-
-            # Save to config
-            config["service_two"][f"file{file_index}"]["file_path"] = file_path
-            save_config(config)
-            
-        except Exception as e:
-            logger.error(f"Failed to load file {file_path}: {e}")
-            print(f"Error loading file: {e}")
+            except Exception as e:
+                logger.error(f"Failed to load file {file_path}: {e}")
+                print(f"Error loading file: {e}")
+
+        # Read sheet names off the Tk thread (workbook contents are not loaded)
+        load_sheet_names_async(button, file_path, on_sheets_loaded)
 
 
 def handle_dropdown_selection(selected_sheet: str, 
@@ -66,34 +77,38 @@ def handle_dropdown_selection(selected_sheet: str,
     Loads headers from the selected sheet.
     If File 1 is selected, populates the unique key dropdown and column checkboxes.
     """
+    config = load_config()
+    file_path = config["service_two"][f"file{file_index}"]["file_path"]
+
+    # Same file and sheet picked again, the widgets are already up to date
+    if _last_selection.get(file_index) == (file_path, selected_sheet):
+        return
+
     print(f"File {file_index} selected sheet is set to: {selected_sheet}")
 
-    config = load_config()
     config["service_two"][f"file{file_index}"]["sheet_name"] = selected_sheet
     save_config(config)
-
-    file_path = config["service_two"][f"file{file_index}"]["file_path"]
     
     try:
-        # Load headers
-        df = pd.read_excel(file_path, sheet_name=selected_sheet, engine='openpyxl', nrows=0)
-        column_list = df.columns.tolist()
+        # Load headers (first row only, the workbook is closed right after)
+        column_list = read_header_only(file_path, selected_sheet)
 
         # Logic specific to File 1 (The Reference File)
         if file_index == 1:
             # Fill unique key dropdown
-            unique_key_dropdown.configure(values=column_list)
+            unique_key_dropdown.configure(values=tuple(column_list))
             unique_key_dropdown.set("Select Unique Key")
 
             # Clear existing checkboxes
             for widget in checkbox_frame.winfo_children():
                 widget.destroy()
-            checkbox_vars.clear()
+            clear_checkbox_state()
             
             # --- Helper: Select All ---
             def select_all() -> None:
-                for var in checkbox_vars.values():
-                    var.set(True)
+                for checkbox in column_checkboxes:
+                    checkbox.select()
+                checked_bits[:] = b"\x01" * len(checked_bits)
 
             select_all_button = ctk.CTkButton(
                 checkbox_frame, 
@@ -105,18 +120,45 @@ def handle_dropdown_selection(selected_sheet: str,
             select_all_button.pack(anchor='w', pady=(0, 5))
             # --------------------------
 
-            # Generate Checkboxes
-            for col in column_list:
-                var = ctk.BooleanVar()
-                cb = ctk.CTkCheckBox(checkbox_frame, text=col, variable=var)
-                cb.pack(anchor='w', pady=2)
-                checkbox_vars[col] = var
+            # Generate Checkboxes in batches, so wide sheets don't freeze the UI
+            def add_checkboxes(start: int) -> None:
+                # Stop if the checkboxes were rebuilt for another sheet meanwhile
+                if not select_all_button.winfo_exists():
+                    return
+
+                for col in column_list[start:start + CHECKBOX_BATCH_SIZE]:
+                    cb = ctk.CTkCheckBox(checkbox_frame, text=col)
+                    cb.configure(command=lambda i=len(column_names), box=cb: toggle_column(i, box))
+                    cb.pack(anchor='w', pady=2)
+
+                    column_names.append(col)
+                    checked_bits.append(0)
+                    column_checkboxes.append(cb)
+
+                if start + CHECKBOX_BATCH_SIZE < len(column_list):
+                    checkbox_frame.after_idle(add_checkboxes, start + CHECKBOX_BATCH_SIZE)
+
+            add_checkboxes(0)
+
+        _last_selection[file_index] = (file_path, selected_sheet)
 
     except Exception as e:
         logger.error(f"Error reading sheet {selected_sheet}: {e}")
         print(f"Error reading columns: {e}")
 
 
+def toggle_column(index: int, checkbox: ctk.CTkCheckBox) -> None:
+    """Mirrors a checkbox click into 'checked_bits'."""
+    checked_bits[index] = checkbox.get()
+
+
+def clear_checkbox_state() -> None:
+    """Forgets all column checkboxes and their checked state."""
+    column_names.clear()
+    checked_bits.clear()
+    column_checkboxes.clear()
+
+
 def on_unique_key_selected(selected: str) -> None:
     """Callback when a unique key is chosen."""
     config = load_config()
@@ -127,7 +169,8 @@ def on_unique_key_selected(selected: str) -> None:
 
 def save_checked_columns() -> None:
     """Callback to save the columns selected via checkboxes."""
-    selected_columns = [col for col, var in checkbox_vars.items() if var.get()]
+    # Stored as text, compare() maps the names back to the sheet's labels
+    selected_columns = [str(col) for col, checked in zip(column_names, checked_bits) if checked]
     
     config = load_config()
     config["service_two"]["compare_columns"] = selected_columns
@@ -135,6 +178,22 @@ def save_checked_columns() -> None:
     
     print(f"Columns selected for comparison: {len(selected_columns)}")
 
+
+def run_comparison(button: ctk.CTkButton) -> None:
+    """
+    Runs compare() on a worker thread so the window keeps responding.
+    The button stays disabled until the comparison has finished.
+    """
+    button.configure(state="disabled")
+
+    def on_error(e: Exception) -> None:
+        logger.error(f"Comparison failed: {e}")
+        print(f"Comparison failed: {e}")
+        button.configure(state="normal")
+
+    # The button polls for the result, so it is re-enabled on the Tk thread
+    run_in_background(button, compare, lambda _: button.configure(state="normal"), on_error)
+
 # ==========================================
 # 3. LAYOUT INITIALIZATION
 # ==========================================
@@ -147,7 +206,8 @@ def setup_service_two(left_frame: ctk.CTkFrame, right_frame: ctk.CTkFrame) -> No
     # Clear frames & Reset state
     clear_frame(left_frame)
     clear_frame(right_frame)
-    checkbox_vars.clear()
+    clear_checkbox_state()
+    _last_selection.clear()
 
     from _gui.layout import setup_default_layout
 
@@ -238,7 +298,7 @@ def setup_service_two(left_frame: ctk.CTkFrame, right_frame: ctk.CTkFrame) -> No
         text="4. Run Comparison", 
         fg_color="green",
         hover_color="darkgreen",
-        command=compare
+        command=lambda: run_comparison(analyse_button)
     )
     analyse_button.grid(row=8, column=0, columnspan=2, pady=20, padx=10, sticky="ew")
     
@@ -6,14 +6,28 @@
 import os
 import pandas as pd
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 from _config.settings import load_config
-from _utils.functions import open_file
+from _utils.functions import EXCEL_ENGINE, READ_OPTIONS, match_columns, open_file
 
 # Initialize Logger
 logger = logging.getLogger('AppLogger')
 
+# Optional streaming writer, openpyxl is used when it is not installed
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+# Upper bound on workbooks read at the same time
+MAX_READ_WORKERS = 8
+
+# Ordinal lookup tables (6th to 20th all end in "th")
+_ORDINAL_SUFFIX = {1: "st", 2: "nd", 3: "rd"}
+_ORDINAL_WORDS = ("", "first", "second", "third", "fourth", "fifth") + tuple(f"{n}th" for n in range(6, 21))
+
 # ==========================================
 # 2. HELPER FUNCTIONS
 # ==========================================
@@ -22,14 +36,29 @@ def get_ordinal(n: int) -> str:
     """Returns the ordinal suffix for a number (e.g., 1st, 2nd, 3rd)."""
     if 10 <= n <= 20:
         return "th"
-    return {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return _ORDINAL_SUFFIX.get(n % 10, "th")
 
 
 def get_ordinal_word(n: int) -> str:
     """Returns the ordinal word (e.g., first, second, third)."""
-    # Simple mapping for common cases, falling back to numeric ordinal
-    ordinals = {1: "first", 2: "second", 3: "third", 4: "fourth", 5: "fifth"}
-    return ordinals.get(n, f"{n}{get_ordinal(n)}")
+    # Precomputed up to 20, falling back to numeric ordinal
+    if 0 < n < len(_ORDINAL_WORDS):
+        return _ORDINAL_WORDS[n]
+    return f"{n}{get_ordinal(n)}"
+
+
+def write_sheet(workbook: "xlsxwriter.Workbook", sheet_name: str, df: pd.DataFrame) -> None:
+    """
+    Writes a DataFrame to a new xlsxwriter sheet, one row at a time.
+    Rows must arrive in order in constant memory mode, which pandas'
+    to_excel (column by column) does not guarantee.
+    """
+    worksheet = workbook.add_worksheet(sheet_name)
+    worksheet.write_row(0, 0, [str(col) for col in df.columns])
+
+    for row_index, row in enumerate(df.itertuples(index=False, name=None), start=1):
+        # Missing values are left as empty cells
+        worksheet.write_row(row_index, 0, [None if pd.isna(value) else value for value in row])
 
 # ==========================================
 # 3. CORE LOGIC
@@ -46,19 +75,30 @@ def service_merge() -> Optional[pd.DataFrame]:
     sheet_names = config["service_eight"]["sheet_names"]
     merging_columns = config["service_eight"]["merging_columns"]
 
-    merged_df = None
+    frames = []
+    seen_columns = set()
     
     print("Starting merge process...")
 
+    # Read all files concurrently, the merge below consumes them in order
+    executor = ThreadPoolExecutor(max_workers=max(1, min(MAX_READ_WORKERS, len(file_paths))))
+    futures = [
+        executor.submit(pd.read_excel, file_path, sheet_name=sheet_name, engine=EXCEL_ENGINE, **READ_OPTIONS)
+        for file_path, sheet_name in zip(file_paths, sheet_names)
+    ]
+    executor.shutdown(wait=False)
+
     for i, file_path in enumerate(file_paths):
-        sheet_name = sheet_names[i]
         merging_column = merging_columns[i]
         
         print(f"Processing File {i+1}: {os.path.basename(file_path)}...")
 
         try:
             # Load Data
-            df = pd.read_excel(file_path, sheet_name=sheet_name, engine='openpyxl')
+            df = futures[i].result()
+
+            # The config stores the name as text, map it to the label read (e.g. '2024' to 2024)
+            merging_column, = match_columns(df.columns, [merging_column])
 
             # Validate Column Exists
             if merging_column not in df.columns:
@@ -68,30 +108,47 @@ def service_merge() -> Optional[pd.DataFrame]:
                 continue
 
             # Normalize Merge Key to String to avoid type mismatches
-            df[merging_column] = df[merging_column].astype(str).fillna('')
+            # (skipped when every key is already a string, the common case)
+            if pd.api.types.infer_dtype(df[merging_column], skipna=False) != "string":
+                df[merging_column] = df[merging_column].astype(str)
 
-            # Perform Merge
-            if merged_df is None:
-                # First file becomes the base
-                merged_df = df.rename(columns={merging_column: 'merge_key'})
-            else:
-                # Subsequent files are merged onto the base
-                current_df = df.rename(columns={merging_column: 'merge_key'})
-                
-                # Merge outer to keep all records
-                suffix = f"_{get_ordinal_word(i + 1)}"
-                merged_df = pd.merge(
-                    merged_df, 
-                    current_df, 
-                    on='merge_key', 
-                    how='outer', 
-                    suffixes=('', suffix)
-                )
+            # Suffix columns already taken by earlier files (first file keeps its names)
+            suffix = f"_{get_ordinal_word(i + 1)}"
+            renames = {merging_column: 'merge_key'}
+            for col in df.columns:
+                if col != merging_column and col in seen_columns:
+                    renames[col] = f"{col}{suffix}"
+
+            df = df.rename(columns=renames).set_index('merge_key')
+            seen_columns.update(df.columns)
+            frames.append(df)
 
         except Exception as e:
             msg = f"Error processing file {i+1}: {e}"
             print(msg)
             logger.error(msg)
+
+            # Drop reads that have not started yet
+            for future in futures:
+                future.cancel()
+            return None
+
+    merged_df = None
+
+    if frames:
+        try:
+            # Outer join every file on the key at once to keep all records
+            if len(frames) == 1:
+                merged_df = frames[0]
+            else:
+                # Sorted by key, like the outer merges this replaced
+                merged_df = frames[0].join(frames[1:], how='outer').sort_index(kind='stable')
+            merged_df = merged_df.reset_index()
+
+        except Exception as e:
+            msg = f"Error merging files: {e}"
+            print(msg)
+            logger.error(msg)
             return None
 
     if merged_df is not None:
@@ -125,33 +182,45 @@ def save_to_excel(merged_df: pd.DataFrame) -> None:
         
     # Ensure directory exists
     output_dir = "outputs/merged_files"
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
 
     filepath = f"{output_dir}/merged_{file_name_str}.xlsx"
 
     try:
         # 2. Filter Columns
-        # Ensure selected columns actually exist in the dataframe
-        valid_columns = [col for col in selected_columns if col in merged_df.columns]
+        # Ensure selected columns actually exist in the dataframe (in selection order)
+        valid_columns = pd.Index(selected_columns).intersection(merged_df.columns, sort=False)
         
-        if not valid_columns:
+        if valid_columns.empty:
             print("Error: None of the selected columns exist in the merged data.")
             return
             
         trimmed_df = merged_df[valid_columns]
 
+        # Create Information Sheet for traceability
+        info_data = {
+            "Source File": [os.path.basename(f) for f in file_paths],
+            "Sheet Name": sheet_names,
+            "Order": [i + 1 for i in range(len(file_paths))]
+        }
+
         # 3. Write to Excel
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-            trimmed_df.to_excel(writer, sheet_name='Data', index=False)
-
-            # Create Information Sheet for traceability
-            info_data = {
-                "Source File": [os.path.basename(f) for f in file_paths],
-                "Sheet Name": sheet_names,
-                "Order": [i + 1 for i in range(len(file_paths))]
-            }
-            pd.DataFrame(info_data).to_excel(writer, sheet_name='Information', index=False)
+        if xlsxwriter:
+            # Constant memory mode flushes each row to disk as it is written.
+            # strings_to_urls off: text is written as is, like the openpyxl path
+            options = {"constant_memory": True, "strings_to_urls": False, "default_date_format": "yyyy-mm-dd hh:mm:ss"}
+            with xlsxwriter.Workbook(filepath, options) as workbook:
+                write_sheet(workbook, 'Data', trimmed_df)
+
+                # Small table, written straight from the dict (no DataFrame)
+                info_sheet = workbook.add_worksheet('Information')
+                info_sheet.write_row(0, 0, list(info_data))
+                for row_index, row in enumerate(zip(*info_data.values()), start=1):
+                    info_sheet.write_row(row_index, 0, row)
+        else:
+            with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
+                trimmed_df.to_excel(writer, sheet_name='Data', index=False)
+                pd.DataFrame(info_data).to_excel(writer, sheet_name='Information', index=False)
 
         print(f"File saved successfully to:\n{filepath}")
         
@@ -5,15 +5,26 @@
 # Third-Party Libraries
 import os
 import logging
+import importlib.util
 import pandas as pd
 import numpy as np
 
 from _config.settings import load_config
-from _utils.functions import auto_header_finder, clean_sheet_name, open_file
+from _utils.functions import EXCEL_ENGINE, READ_OPTIONS, auto_header_finder, clean_sheet_name, match_columns, open_file
 
 # Initialize Logger
 logger = logging.getLogger('AppLogger')
 
+# Arrow-backed strings when pyarrow is installed, so string methods run as compiled kernels
+ID_DTYPE = "string[pyarrow]" if importlib.util.find_spec("pyarrow") else "string"
+
+# xlsxwriter writes noticeably faster than openpyxl. constant_memory is left off
+# because pandas emits cells column by column, which that mode cannot accept.
+WRITER_ENGINE = "xlsxwriter" if importlib.util.find_spec("xlsxwriter") else "openpyxl"
+
+# xlsxwriter would otherwise turn URL-like text into hyperlinks (openpyxl never does)
+WRITER_KWARGS = {"engine_kwargs": {"options": {"strings_to_urls": False}}} if WRITER_ENGINE == "xlsxwriter" else {}
+
 # ==========================================
 # 2. ANALYSIS LOGIC
 # ==========================================
@@ -34,6 +45,13 @@ def analyse() -> None:
     file1_data = config["service_one"]["file1"]
     file2_data = config["service_one"]["file2"]
 
+    # Only the configured columns are kept when the files are parsed.
+    # Names are stored as text, so labels are compared as text too (e.g. 2024).
+    names1 = [file1_data["unique_id_column"], file1_data["forecast_column"], *file1_data["extra_columns"]]
+    names2 = [file2_data["unique_id_column"], file2_data["forecast_column"]]
+    wanted1 = {str(name) for name in names1} | {"Subregion"}
+    wanted2 = {str(name) for name in names2} | {"Subregion"}
+
     try:
         # ==========================================
         # LOAD DATA
@@ -45,7 +63,10 @@ def analyse() -> None:
         excel1 = pd.read_excel(
             file1_data["file_path"], 
             sheet_name=file1_data["sheet_name"], 
-            header=first_header_row
+            header=first_header_row,
+            usecols=lambda col: str(col) in wanted1,
+            engine=EXCEL_ENGINE,
+            **READ_OPTIONS
         )
 
         #### Load 2nd Excel File ####
@@ -54,7 +75,10 @@ def analyse() -> None:
         excel2 = pd.read_excel(
             file2_data["file_path"], 
             sheet_name=file2_data["sheet_name"], 
-            header=second_header_row
+            header=second_header_row,
+            usecols=lambda col: str(col) in wanted2,
+            engine=EXCEL_ENGINE,
+            **READ_OPTIONS
         )
 
         # ==========================================
@@ -66,13 +90,9 @@ def analyse() -> None:
         if not has_subregion:
             logger.info("'Subregion' column missing in one or both files. Proceeding without subregion grouping.")
 
-        # Define columns to pull
-        id_col1 = file1_data["unique_id_column"]
-        fc_col1 = file1_data["forecast_column"]
-        extra_cols = file1_data["extra_columns"]
-        
-        id_col2 = file2_data["unique_id_column"]
-        fc_col2 = file2_data["forecast_column"]
+        # Define columns to pull (config names mapped to the labels read)
+        id_col1, fc_col1, *extra_cols = match_columns(excel1.columns, names1)
+        id_col2, fc_col2 = match_columns(excel2.columns, names2)
 
         # Build column list for File 1
         cols_pull1 = [id_col1, fc_col1] + extra_cols
@@ -87,12 +107,14 @@ def analyse() -> None:
         # Trim DataFrames
         excel1_trim = excel1[cols_pull1].copy()
         excel2_trim = excel2[cols_pull2].copy()
+        # Drop the raw reads so only the trimmed frames stay resident
+        del excel1, excel2
 
         print("Processing and cleaning data...")
 
         # Normalize ID Columns (Strip whitespace & Lowercase) to ensure accurate merge
-        excel1_trim[id_col1] = excel1_trim[id_col1].astype(str).str.strip().str.lower()
-        excel2_trim[id_col2] = excel2_trim[id_col2].astype(str).str.strip().str.lower()
+        excel1_trim[id_col1] = excel1_trim[id_col1].astype(str).astype(ID_DTYPE).str.strip().str.lower()
+        excel2_trim[id_col2] = excel2_trim[id_col2].astype(str).astype(ID_DTYPE).str.strip().str.lower()
 
         # Rename File 2 columns to match File 1 for merging
         rename_map = {
@@ -122,27 +144,28 @@ def analyse() -> None:
         excel1_trim[fc_col1] = pd.to_numeric(excel1_trim[fc_col1], errors='coerce').fillna(0)
         excel2_trim[fc_col1] = pd.to_numeric(excel2_trim[fc_col1], errors='coerce').fillna(0)
 
-        # Add Source Identifiers
-        excel1_trim['Source'] = 'source1'
-        excel2_trim['Source'] = 'source2'
-
         # ==========================================
         # MERGE & PIVOT
         # ==========================================
-        
-        combined_df = pd.concat([excel1_trim, excel2_trim], ignore_index=True)
 
         # Define Index for Pivot
         pivot_index = [id_col1] + extra_cols
         if has_subregion:
             pivot_index.append("Subregion")
 
-        pivot_table = combined_df.pivot_table(
-            index=pivot_index,
-            columns='Source',
-            values=fc_col1,
-            aggfunc='first' # Use first if duplicates exist
-        ).fillna(0) # Fill NaNs with 0 for calculation
+        # Align both sources side by side with one outer merge. As a pivot would,
+        # rows with missing keys are dropped and the first duplicate is used
+        sources = []
+        for source, frame in (("source1", excel1_trim), ("source2", excel2_trim)):
+            frame = frame.dropna(subset=pivot_index).drop_duplicates(subset=pivot_index)
+            sources.append(frame[pivot_index + [fc_col1]].rename(columns={fc_col1: source}))
+
+        pivot_table = (
+            sources[0].merge(sources[1], on=pivot_index, how='outer')
+            .set_index(pivot_index)
+            .sort_index()
+            .fillna(0) # Fill NaNs with 0 for calculation
+        )
 
         # ==========================================
         # CALCULATIONS
@@ -152,11 +175,11 @@ def analyse() -> None:
 
         # Calculate Similarity %
         # Logic: (1 - |diff| / source1) * 100
-        pivot_table['Similarity %'] = pivot_table.apply(
-            lambda row: (1 - abs(row['source1'] - row['source2']) / row['source1']) * 100
-            if row['source1'] != 0 else 0,
-            axis=1
-        )
+        source1 = pivot_table['source1'].to_numpy(dtype=np.float64)
+        source2 = pivot_table['source2'].to_numpy(dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            similarity = (1 - np.abs(source1 - source2) / source1) * 100
+        pivot_table['Similarity %'] = np.where(source1 != 0, similarity, 0)
 
         # Sort: Highest difference first
         pivot_table = pivot_table.sort_values(
@@ -173,14 +196,13 @@ def analyse() -> None:
         file_name2 = os.path.splitext(os.path.basename(file2_data["file_path"]))[0]
         
         output_dir = "outputs/forecast_comparisons"
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+        os.makedirs(output_dir, exist_ok=True)
             
         output_file_name = f"{output_dir}/comparison_{file_name1}_vs_{file_name2}.xlsx"
 
         print(f"Exporting to {output_file_name}...")
 
-        with pd.ExcelWriter(output_file_name, engine="openpyxl") as writer:
+        with pd.ExcelWriter(output_file_name, engine=WRITER_ENGINE, **WRITER_KWARGS) as writer:
             # 1. Info Sheet
             info_data = {
                 "Metric": ["Source 1 File", "Source 2 File", "ID Column", "Forecast Column"],
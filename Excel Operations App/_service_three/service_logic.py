@@ -13,6 +13,7 @@ import warnings
 from io import BytesIO
 from typing import Optional, Any
 
+import numpy as np
 import pandas as pd
 import matplotlib
 matplotlib.use('Agg') # Non-interactive backend for generating images
@@ -22,8 +23,16 @@ import matplotlib.dates as mdates
 from jinja2 import Environment, FileSystemLoader
 from markupsafe import Markup
 
+# Optional JIT compiler for the anomaly scan, plain Python is used without it
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        return lambda func: func
+
 # Local Imports
 from _config.settings import load_config
+from _utils.functions import EXCEL_ENGINE, READ_OPTIONS
 
 # Initialize Logger
 logger = logging.getLogger('AppLogger')
@@ -49,25 +58,58 @@ def tojson_filter(value: Any) -> Markup:
     """Custom Jinja2 filter to serialize data to JSON."""
     return Markup(json.dumps(value))
 
-def calculate_total_usage(group: pd.DataFrame) -> pd.DataFrame:
-    """Calculates total usage for a group and appends it as a summary row."""
-    total_usage = group[COL_USAGE].sum()
-    
-    # Create summary row matching the dataframe structure
-    total_usage_row = pd.DataFrame({
-        COL_ID: [group[COL_ID].iloc[0]],
-        COL_COMPANY: [group[COL_COMPANY].iloc[0]],
-        COL_DATE: [group[COL_DATE].iloc[0]],
-        COL_SERVICE: ['Total Usage'],
-        COL_USAGE: [total_usage]
-    })
-    return pd.concat([group, total_usage_row], ignore_index=True)
+def add_total_usage(df_agg: pd.DataFrame) -> pd.DataFrame:
+    """
+    Appends a 'Total Usage' summary row after each (ID, date) group.
+    Totals come from a single groupby-sum instead of a per-group apply.
+    """
+    totals = df_agg.groupby([COL_ID, COL_DATE], as_index=False, observed=True).agg(
+        **{COL_COMPANY: (COL_COMPANY, 'first'), COL_USAGE: (COL_USAGE, 'sum')}
+    )
+    totals[COL_SERVICE] = 'Total Usage'
+
+    # Stable sort keeps each group's rows in order, with its total last
+    combined = pd.concat([df_agg, totals[df_agg.columns]], ignore_index=True)
+    return combined.sort_values([COL_ID, COL_DATE], kind='stable', ignore_index=True)
 
 
 # ==========================================
 # 4. ANOMALY DETECTION LOGIC
 # ==========================================
 
+@njit(cache=True, nogil=True)
+def _flag_kernel(usage, baseline, window, shift_window, threshold_percent, threshold_abs):
+    """
+    Scans one date-sorted usage series for sustained shifts, 'baseline[i]'
+    being the median of the 'window' values before position i.
+    Returns the flagged positions and their direction (1 increase, -1 decrease).
+    """
+    n = usage.shape[0]
+    flagged = np.zeros(n, dtype=np.bool_)
+    direction = np.zeros(n, dtype=np.int8)
+    consecutive_anomalies = 0
+
+    for i in range(window, n):
+        baseline_usage = baseline[i]
+
+        if baseline_usage != 0:
+            absolute_change = abs(usage[i] - baseline_usage)
+            percent_change = absolute_change / abs(baseline_usage) * 100
+
+            if percent_change >= threshold_percent and absolute_change >= threshold_abs:
+                consecutive_anomalies += 1
+                if consecutive_anomalies >= shift_window:
+                    # Flag the shift window, keeping the first direction found
+                    for j in range(i - shift_window + 1, i + 1):
+                        if not flagged[j]:
+                            flagged[j] = True
+                            direction[j] = 1 if usage[j] > baseline_usage else -1
+            else:
+                consecutive_anomalies = 0
+
+    return flagged, direction
+
+
 def flag_anomalies(df: pd.DataFrame, 
                   anomaly_threshold_percent: int = 20, 
                   anomaly_threshold_abs: int = 60, 
@@ -77,43 +119,35 @@ def flag_anomalies(df: pd.DataFrame,
     Flags anomalies based on a sustained shift in usage.
     """
     df_flags = df.copy()
-    df_flags['anomaly'] = False
-    df_flags['anomaly_direction'] = None
+
+    flagged_index = []
+    flagged_direction = []
 
     # Group by Company and Service
-    for _, group in df_flags.groupby([COL_COMPANY, COL_SERVICE]):
-        group = group.sort_values(by=COL_DATE).reset_index()
-        consecutive_anomalies = 0
-
-        for i in range(recent_window_size, len(group)):
-            # Define window
-            historical_window = group.loc[i - recent_window_size:i - 1, COL_USAGE]
-            current_usage = group.loc[i, COL_USAGE]
-
-            if historical_window.empty:
-                continue
-
-            baseline_usage = historical_window.median()
-
-            if baseline_usage != 0:
-                percent_change = abs((current_usage - baseline_usage) / baseline_usage) * 100
-                absolute_change = abs(current_usage - baseline_usage)
-
-                is_single_anomaly = (percent_change >= anomaly_threshold_percent) and (absolute_change >= anomaly_threshold_abs)
-
-                if is_single_anomaly:
-                    consecutive_anomalies += 1
-                    if consecutive_anomalies >= shift_window:
-                        # Flag the shift window
-                        for j in range(i - shift_window + 1, i + 1):
-                            original_index = group.loc[j, 'index']
-                            # Only flag if not already flagged to preserve direction
-                            if not df_flags.loc[original_index, 'anomaly']:
-                                df_flags.loc[original_index, 'anomaly'] = True
-                                direction = 'increase' if group.loc[j, COL_USAGE] > baseline_usage else 'decrease'
-                                df_flags.loc[original_index, 'anomaly_direction'] = direction
-                else:
-                    consecutive_anomalies = 0
+    for _, group in df_flags.groupby([COL_COMPANY, COL_SERVICE], observed=True):
+        group = group.sort_values(by=COL_DATE)
+        usage = group[COL_USAGE].astype(np.float64)
+
+        # Median of the previous 'recent_window_size' values, in one rolling pass
+        baseline = usage.rolling(recent_window_size, min_periods=1).median().shift(1)
+
+        flagged, direction = _flag_kernel(
+            usage.to_numpy(), baseline.to_numpy(), recent_window_size, shift_window,
+            float(anomaly_threshold_percent), float(anomaly_threshold_abs)
+        )
+
+        if flagged.any():
+            flagged_index.append(group.index[flagged])
+            flagged_direction.append(direction[flagged])
+
+    # Write all flags back at once, direction as category codes (-1 = not flagged)
+    direction_codes = np.full(len(df_flags), -1, dtype=np.int8)
+    if flagged_index:
+        positions = df_flags.index.get_indexer(flagged_index[0].append(flagged_index[1:]))
+        direction_codes[positions] = np.concatenate(flagged_direction) > 0
+
+    df_flags['anomaly'] = direction_codes >= 0
+    df_flags['anomaly_direction'] = pd.Categorical.from_codes(direction_codes, categories=['decrease', 'increase'])
 
     return df_flags
 
@@ -121,25 +155,26 @@ def flag_anomalies(df: pd.DataFrame,
 def get_anomalous_instances(df: pd.DataFrame) -> pd.DataFrame:
     """Returns rows for (company, service) pairs that have at least one anomaly."""
     # Identify pairs that have an anomaly
-    anomalous_pairs = set(
-        df[df['anomaly'] == True][[COL_COMPANY, COL_SERVICE]]
-        .itertuples(index=False, name=None)
-    )
+    anomalous_pairs = pd.MultiIndex.from_frame(df.loc[df['anomaly'] == True, [COL_COMPANY, COL_SERVICE]]).unique()
 
-    # Filter main dataframe to only include those pairs
-    def is_anomalous_pair(row):
-        return (row[COL_COMPANY], row[COL_SERVICE]) in anomalous_pairs
-
-    return df[df.apply(is_anomalous_pair, axis=1)].copy()
+    # Filter main dataframe to only include those pairs (hashed membership test)
+    pairs = pd.MultiIndex.from_arrays([df[COL_COMPANY], df[COL_SERVICE]])
+    return df[pairs.isin(anomalous_pairs)].copy()
 
 
 # ==========================================
 # 5. PLOTTING FUNCTIONS
 # ==========================================
 
-def plot_acr_with_outliers(dates, values, anomalies, title, save_path=None) -> None:
-    """Plots Usage over time, highlighting outlier points."""
-    fig, ax = plt.subplots(figsize=(12, 6))
+def plot_acr_with_outliers(dates, values, anomalies, title, save_path=None, ax=None) -> None:
+    """Plots Usage over time, highlighting outlier points.
+    Pass 'ax' to redraw on an existing Axes (cleared first) instead of creating a new figure."""
+    owns_figure = ax is None
+    if owns_figure:
+        fig, ax = plt.subplots(figsize=(12, 6))
+    else:
+        ax.clear()
+        fig = ax.figure
     
     ax.scatter(dates, values, label='Usage', s=30)
     ax.scatter(dates[anomalies], values[anomalies], color='red', label='Anomaly', s=50)
@@ -154,36 +189,29 @@ def plot_acr_with_outliers(dates, values, anomalies, title, save_path=None) -> N
     ax.xaxis.set_major_formatter(mdates.DateFormatter('%m-%d'))
     fig.autofmt_xdate()
 
-    plt.tight_layout()
+    fig.tight_layout()
 
     if save_path:
-        plt.savefig(save_path)
-        plt.close(fig)
+        fig.savefig(save_path)
+        if owns_figure:
+            plt.close(fig)
     else:
         plt.show()
 
 
-def generate_flags_per_service_chart(df_anomalies_final: pd.DataFrame) -> Optional[str]:
-    """Generates a base64 string of a horizontal bar chart."""
-    service_counts = {}
-    
-    for service in df_anomalies_final[COL_SERVICE].unique():
-        subset = df_anomalies_final[
-            (df_anomalies_final[COL_SERVICE] == service) & 
-            (df_anomalies_final['anomaly'] == True)
-        ]
-        count = subset[COL_COMPANY].nunique()
-        if count > 0:
-            service_counts[service] = count
-
-    if not service_counts:
+def generate_flags_per_service_chart(df_anom: pd.DataFrame) -> Optional[str]:
+    """Generates a base64 string of a horizontal bar chart from the flagged rows."""
+    counts = df_anom.groupby(COL_SERVICE, observed=True)[COL_COMPANY].nunique()
+    counts = counts[counts > 0]
+
+    if counts.empty:
         return None
 
-    top_10 = pd.Series(service_counts).sort_values(ascending=False).head(10)
+    top_10 = counts.nlargest(10)
 
     try:
         fig, ax = plt.subplots(figsize=(8, 6))
-        ax.barh(top_10.index, top_10.values, color='#8fbc8f')
+        ax.barh(top_10.index.tolist(), top_10.values, color='#8fbc8f')
         ax.set_xlabel('Unique Companies Flagging Service')
         ax.set_title('Top 10 Anomalous Services')
         plt.tight_layout()
@@ -199,9 +227,9 @@ def generate_flags_per_service_chart(df_anomalies_final: pd.DataFrame) -> Option
         return None
 
 
-def generate_anomaly_trend_chart(df_anomalies_final: pd.DataFrame) -> Optional[str]:
-    """Generates a base64 string of the anomaly trend line chart."""
-    anomalies_by_date = df_anomalies_final[df_anomalies_final['anomaly'] == True].groupby(COL_DATE)[COL_COMPANY].nunique()
+def generate_anomaly_trend_chart(df_anom: pd.DataFrame) -> Optional[str]:
+    """Generates a base64 string of the anomaly trend line chart from the flagged rows."""
+    anomalies_by_date = df_anom.groupby(COL_DATE)[COL_COMPANY].nunique()
 
     if anomalies_by_date.empty:
         return None
@@ -274,11 +302,12 @@ def analyse() -> None:
         file_path = config["service_three"]["file_path"]
         sheet = config["service_three"]["sheet_name"]
         
+        required_cols = [COL_ID, COL_COMPANY, COL_DATE, COL_SERVICE, COL_USAGE]
+
         print("Reading Excel file (this may take a moment)...")
-        df = pd.read_excel(file_path, sheet_name=sheet)
+        df = pd.read_excel(file_path, sheet_name=sheet, usecols=lambda col: col in required_cols, engine=EXCEL_ENGINE, **READ_OPTIONS)
         
         # Verify columns exist
-        required_cols = [COL_ID, COL_COMPANY, COL_DATE, COL_SERVICE, COL_USAGE]
         if not all(col in df.columns for col in required_cols):
             missing = [col for col in required_cols if col not in df.columns]
             raise ValueError(f"Missing required columns in Excel: {missing}")
@@ -292,7 +321,13 @@ def analyse() -> None:
     try:
         print("Preprocessing data...")
         df_trim = df[required_cols].copy()
+        del df  # drop the raw read so only the trimmed frame stays resident
         df_trim[COL_DATE] = pd.to_datetime(df_trim[COL_DATE])
+
+        # Low-cardinality keys as categoricals: groupbys hash integer codes, not strings
+        # (every groupby on them passes observed=True to skip unused combinations)
+        for col in (COL_ID, COL_COMPANY, COL_SERVICE):
+            df_trim[col] = df_trim[col].astype('category')
         
         # Filter last 30 days
         latest_date = df_trim[COL_DATE].max()
@@ -300,8 +335,8 @@ def analyse() -> None:
         df_trim = df_trim[df_trim[COL_DATE] >= x_days_ago].copy()
 
         # Aggregation
-        df_agg = df_trim.groupby([COL_ID, COL_COMPANY, COL_DATE, COL_SERVICE])[COL_USAGE].sum().reset_index()
-        df_agg = df_agg.groupby([COL_ID, COL_DATE], group_keys=False).apply(calculate_total_usage).reset_index(drop=True)
+        df_agg = df_trim.groupby([COL_ID, COL_COMPANY, COL_DATE, COL_SERVICE], observed=True)[COL_USAGE].sum().reset_index()
+        df_agg = add_total_usage(df_agg)
 
     except Exception as e:
         logger.error(f"Processing Error: {e}")
@@ -313,13 +348,17 @@ def analyse() -> None:
         print("Running anomaly detection algorithms...")
         df_anomalies = flag_anomalies(df_agg)
         df_final = get_anomalous_instances(df_anomalies)
+        # Flagged rows only, shared by the direction stats and the summary charts
+        df_anom = df_final[df_final['anomaly']]
         
         # Calculate Stats
         total_companies = df_agg[COL_COMPANY].nunique()
-        total_anomalous_services = df_final.groupby([COL_COMPANY, COL_SERVICE]).ngroups
+        total_anomalous_services = df_final.groupby([COL_COMPANY, COL_SERVICE], observed=True).ngroups
         
         # Direction counts
-        direction_counts = df_final[df_final['anomaly']].groupby(COL_SERVICE)['anomaly_direction'].apply(lambda x: x.value_counts().idxmax())
+        # Majority direction per service from a (service, direction) count table
+        direction_table = df_anom.groupby([COL_SERVICE, 'anomaly_direction'], observed=True).size().unstack(fill_value=0)
+        direction_counts = direction_table.idxmax(axis=1)
         increase_count = len(direction_counts[direction_counts == 'increase'])
         decrease_count = len(direction_counts[direction_counts == 'decrease'])
 
@@ -331,37 +370,46 @@ def analyse() -> None:
     # 4. Generate Visualizations
     try:
         print("Generating charts...")
-        total_usage_per_service = df_agg[df_agg[COL_SERVICE] != 'Total Usage'].groupby(COL_SERVICE)[COL_USAGE].sum()
+        total_usage_per_service = df_agg[df_agg[COL_SERVICE] != 'Total Usage'].groupby(COL_SERVICE, observed=True)[COL_USAGE].sum()
         
-        img_flags = generate_flags_per_service_chart(df_final)
-        img_trend = generate_anomaly_trend_chart(df_final)
+        img_flags = generate_flags_per_service_chart(df_anom)
+        img_trend = generate_anomaly_trend_chart(df_anom)
         img_pie = generate_usage_pie_chart(total_usage_per_service)
         
         # Generate Individual Plots
         plot_data = []
         file_basename = os.path.basename(file_path).rsplit('.', 1)[0]
         output_dir = f'outputs/anomaly_detection/plots_{file_basename}'
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+        os.makedirs(output_dir, exist_ok=True)
 
-        grouped = df_final.groupby([COL_COMPANY, COL_SERVICE])
+        grouped = df_final.groupby([COL_COMPANY, COL_SERVICE], observed=True)
         
         print(f"Generating {len(grouped)} individual time-series plots...")
-        for (company, service), group in grouped:
-            safe_comp = "".join(x for x in str(company) if x.isalnum() or x in " -_").strip()
-            safe_serv = "".join(x for x in str(service) if x.isalnum() or x in " -_").strip()
-            
-            plot_title = f"{company} - {service}"
-            filename = f"{safe_comp}_{safe_serv}.png"
-            save_path = os.path.join(output_dir, filename)
-            
-            plot_acr_with_outliers(group[COL_DATE], group[COL_USAGE], group['anomaly'], plot_title, save_path)
-            
-            plot_data.append({
-                'path': os.path.abspath(save_path),
-                'company_service': plot_title,
-                'median_acr': group[COL_USAGE].median()
-            })
+        # One figure is reused for every pair; building a new one per plot dominates the loop
+        fig, ax = plt.subplots(figsize=(12, 6))
+        try:
+            for (company, service), group in grouped:
+                safe_comp = "".join(x for x in str(company) if x.isalnum() or x in " -_").strip()
+                safe_serv = "".join(x for x in str(service) if x.isalnum() or x in " -_").strip()
+                
+                plot_title = f"{company} - {service}"
+                filename = f"{safe_comp}_{safe_serv}.png"
+                save_path = os.path.join(output_dir, filename)
+                
+                plot_acr_with_outliers(
+                    group[COL_DATE].to_numpy(),
+                    group[COL_USAGE].to_numpy(),
+                    group['anomaly'].to_numpy(dtype=bool),
+                    plot_title, save_path, ax=ax
+                )
+                
+                plot_data.append({
+                    'path': os.path.abspath(save_path),
+                    'company_service': plot_title,
+                    'median_acr': group[COL_USAGE].median()
+                })
+        finally:
+            plt.close(fig)
 
     except Exception as e:
         logger.error(f"Visualization Error: {e}")
@@ -382,12 +430,14 @@ def analyse() -> None:
         env.filters['tojson'] = tojson_filter 
         template = env.get_template(os.path.basename(template_path))
 
-        # Sort data for display
-        plot_data_company = sorted(plot_data, key=lambda x: x['company_service'])
-        plot_data_acr = sorted(plot_data, key=lambda x: x['median_acr'], reverse=True)
+        # Sort data for display (stable argsorts on the extracted keys)
+        names = np.array([p['company_service'] for p in plot_data], dtype=str)
+        acrs = np.array([p['median_acr'] for p in plot_data], dtype=float)
+        plot_data_company = [plot_data[i] for i in np.argsort(names, kind='stable')]
+        plot_data_acr = [plot_data[i] for i in np.argsort(-acrs, kind='stable')]
         
         # Mocking top affected (simplified)
-        top_affected = df_final.groupby(COL_COMPANY)[COL_SERVICE].nunique().sort_values(ascending=False).head(3)
+        top_affected = df_final.groupby(COL_COMPANY, observed=True)[COL_SERVICE].nunique().sort_values(ascending=False).head(3)
 
         html_content = template.render(
             report_title="Anomalous Service Report",
@@ -5,12 +5,22 @@
 # Third-Party Libraries
 import os
 import logging
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
 from openpyxl import Workbook
-from openpyxl.styles import PatternFill
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import NamedStyle, PatternFill
+
+# Optional faster writer for the report, openpyxl is used when it is not installed
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
 
 from _config.settings import load_config
-from _utils.functions import open_file
+from _utils.functions import EXCEL_ENGINE, match_columns, open_file
 
 # Initialize Logger
 logger = logging.getLogger('AppLogger')
@@ -38,8 +48,17 @@ def compare() -> None:
     sheet2 = config["service_two"]["file2"]["sheet_name"]
 
     unique_key = config["service_two"]["unique_id_column"]
-    compare_columns = config["service_two"]["compare_columns"]
+    # Copy so the cached config is not modified below
+    compare_columns = list(config["service_two"]["compare_columns"])
     
+    # Optional read hints ("dtypes": {column: dtype}, "date_columns": [column, ...]).
+    # Declared types skip pandas' per-column inference when parsing the sheets.
+    read_options = {}
+    if config["service_two"].get("dtypes"):
+        read_options["dtype"] = config["service_two"]["dtypes"]
+    if config["service_two"].get("date_columns"):
+        read_options["parse_dates"] = config["service_two"]["date_columns"]
+
     # Ensure unique_key is not in compare_columns (avoid redundancy)
     if unique_key in compare_columns:
         compare_columns.remove(unique_key)
@@ -47,8 +66,14 @@ def compare() -> None:
     try:
         # Load DataFrames
         print("Reading Excel files...")
-        df1 = pd.read_excel(file1_path, sheet_name=sheet1, engine='openpyxl')
-        df2 = pd.read_excel(file2_path, sheet_name=sheet2, engine='openpyxl')
+        # Both files are read concurrently so their parsing overlaps
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            future1 = executor.submit(pd.read_excel, file1_path, sheet_name=sheet1, engine=EXCEL_ENGINE, **read_options)
+            future2 = executor.submit(pd.read_excel, file2_path, sheet_name=sheet2, engine=EXCEL_ENGINE, **read_options)
+            df1, df2 = future1.result(), future2.result()
+
+        # The config stores names as text, map them to the labels read (e.g. '2024' to 2024)
+        unique_key, *compare_columns = match_columns(df1.columns, [unique_key, *compare_columns])
 
         # ==========================================
         # ALIGNMENT & INTERSECTION
@@ -75,133 +100,98 @@ def compare() -> None:
         df2 = df2[reordered_columns].copy()
 
         # 2. Align Rows (Intersection of Keys)
-        df1_keys = set(df1[unique_key].dropna())
-        df2_keys = set(df2[unique_key].dropna())
-        common_keys = df1_keys.intersection(df2_keys)
-
-        df1_aligned = df1[df1[unique_key].isin(common_keys)].copy()
-        df2_aligned = df2[df2[unique_key].isin(common_keys)].copy()
+        df1 = df1.dropna(subset=[unique_key])
+        df2 = df2.dropna(subset=[unique_key])
+
+        if df1[unique_key].is_unique and df2[unique_key].is_unique:
+            # Unique keys: one sorted hash join pairs the rows and orders them by key
+            merged = df1.merge(
+                df2[[unique_key] + compare_columns],
+                on=unique_key,
+                how='inner',
+                sort=True,
+                suffixes=('', '_new')
+            )
+            df1_aligned = merged[reordered_columns]
+            df2_aligned = merged[[f"{col}_new" for col in compare_columns]].set_axis(compare_columns, axis=1)
+        else:
+            # Duplicate keys: rows are paired by position after sorting both sides
+            common_keys = set(df1[unique_key]).intersection(df2[unique_key])
+            df1_aligned = df1[df1[unique_key].isin(common_keys)]
+            df2_aligned = df2[df2[unique_key].isin(common_keys)]
+
+            # 3. Sort (Crucial for row-by-row comparison)
+            sortable_columns = [col for col in df1.columns if col not in compare_columns]
+            if unique_key in sortable_columns:
+                sortable_columns.remove(unique_key)
+            sortable_columns.insert(0, unique_key)
+
+            df1_aligned = df1_aligned.sort_values(by=sortable_columns).reset_index(drop=True)
+            df2_aligned = df2_aligned.sort_values(by=sortable_columns).reset_index(drop=True)
 
         print(f"Aligned DataFrames: {len(df1_aligned)} shared rows found.")
 
-        # 3. Sort (Crucial for row-by-row comparison)
-        sortable_columns = [col for col in df1.columns if col not in compare_columns]
-        if unique_key in sortable_columns:
-            sortable_columns.remove(unique_key)
-        sortable_columns.insert(0, unique_key)
-
-        df1_aligned = df1_aligned.sort_values(by=sortable_columns).reset_index(drop=True)
-        df2_aligned = df2_aligned.sort_values(by=sortable_columns).reset_index(drop=True)
-
         # ==========================================
         # VALUE COMPARISON
         # ==========================================
         
         print("Comparing values...")
-        result_df = df1_aligned.copy()
-        mismatches = [] # Stores (row_index, col_name)
-
-        # Iterate rows
-        for idx in range(len(df1_aligned)):
-            for col in compare_columns:
-                val1 = df1_aligned.iloc[idx][col]
-                val2 = df2_aligned.iloc[idx][col]
-
-                # Treat NaNs as equal
-                if pd.isna(val1) and pd.isna(val2):
-                    continue
-
-                if val1 != val2:
-                    # Record change string
-                    result_df.at[idx, col] = f"{val1} → {val2}"
-                    mismatches.append((idx, col))
-
-        print(f"{len(mismatches)} individual cell changes found.")
+        # Change strings per row, keyed by column position: {row_index: {col_index: "old → new"}}.
+        # The report writes df1's values and swaps these in, so no result copy is needed.
+        column_position = {col_name: c_idx for c_idx, col_name in enumerate(df1_aligned.columns)}
+        changes: Dict[int, Dict[int, str]] = {}
+        mismatch_count = 0
+
+        # Compare one column at a time: each column keeps its own dtype and the
+        # check runs over the whole column instead of cell by cell
+        for col in compare_columns:
+            col1 = df1_aligned[col]
+            col2 = df2_aligned[col]
+
+            # Treat NaNs as equal (nullable dtypes give NA when only one side is missing: a change)
+            changed = (col1 != col2) & ~(col1.isna() & col2.isna())
+            rows = np.flatnonzero(changed.to_numpy(dtype=bool, na_value=True))
+            if len(rows) == 0:
+                continue
+
+            # Record change strings
+            c_idx = column_position[col]
+            old_vals = col1.to_numpy(dtype=object)[rows]
+            new_vals = col2.to_numpy(dtype=object)[rows]
+            for idx, val1, val2 in zip(rows.tolist(), old_vals, new_vals):
+                changes.setdefault(idx, {})[c_idx] = f"{val1} → {val2}"
+            mismatch_count += len(rows)
+
+        print(f"{mismatch_count} individual cell changes found.")
 
         # ==========================================
         # EXCEL GENERATION
         # ==========================================
         
         print("Generating report...")
-        wb = Workbook()
-
-        # --- Sheet 1: Info ---
-        info_sheet = wb.active
-        info_sheet.title = "Info"
-        info_sheet["A1"], info_sheet["B1"] = "File 1 Path:", file1_path
-        info_sheet["A2"], info_sheet["B2"] = "File 2 Path:", file2_path
-        info_sheet["A3"], info_sheet["B3"] = "Explanation:", "'Old → New'"
-
-        # --- Sheet 2: Full Result ---
-        wb.create_sheet("Full Result")
-        full_sheet = wb["Full Result"]
-
-        # Write Headers
-        for col_idx, col_name in enumerate(result_df.columns, 1):
-            full_sheet.cell(row=1, column=col_idx, value=col_name)
-
-        # Write Data
-        for r_idx, row in result_df.iterrows():
-            for c_idx, value in enumerate(row, 1):
-                full_sheet.cell(row=r_idx + 2, column=c_idx, value=value)
-
-        # Highlight Mismatches
-        yellow_fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
-        
-        # Set of row indices (0-based) that have changes
-        highlighted_row_indices = set()
-
-        for row_idx, col_name in mismatches:
-            # Excel is 1-based, plus 1 for header = row_idx + 2
-            excel_row = row_idx + 2
-            # Find column index
-            col_idx = list(result_df.columns).index(col_name) + 1
-            
-            # Apply fill
-            full_sheet.cell(row=excel_row, column=col_idx).fill = yellow_fill
-            
-            # Track this row for the Filtered Sheet
-            highlighted_row_indices.add(row_idx)
-
-        # --- Sheet 3: Filtered Result (Optimized) ---
-        wb.create_sheet("Filtered Result")
-        filtered_sheet = wb["Filtered Result"]
-
-        # Write Headers
-        for col_idx, col_name in enumerate(result_df.columns, 1):
-            filtered_sheet.cell(row=1, column=col_idx, value=col_name)
-
-        # Write only changed rows sequentially
-        current_write_row = 2
-        
-        # Iterate through the Original Result DF
-        for r_idx, row in result_df.iterrows():
-            if r_idx in highlighted_row_indices:
-                # Write the whole row
-                for c_idx, value in enumerate(row, 1):
-                    cell = filtered_sheet.cell(row=current_write_row, column=c_idx, value=value)
-                    
-                    # Re-apply highlight if this specific cell changed
-                    # (Check if this (r_idx, col_name) exists in mismatches)
-                    col_name = result_df.columns[c_idx - 1]
-                    if (r_idx, col_name) in mismatches:
-                         cell.fill = yellow_fill
-                
-                current_write_row += 1
+
+        info_rows = [
+            ["File 1 Path:", file1_path],
+            ["File 2 Path:", file2_path],
+            ["Explanation:", "'Old → New'"]
+        ]
 
         # ==========================================
         # SAVE
         # ==========================================
         
         output_dir = "outputs/compare_changes"
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+        os.makedirs(output_dir, exist_ok=True)
 
         file1_name = os.path.basename(file1_path).rsplit('.', 1)[0]
         file2_name = os.path.basename(file2_path).rsplit('.', 1)[0]
         output_path = f"{output_dir}/comparison_{file1_name}_vs_{file2_name}.xlsx"
 
-        wb.save(output_path)
+        if xlsxwriter:
+            write_report_xlsxwriter(output_path, info_rows, df1_aligned, changes)
+        else:
+            write_report_openpyxl(output_path, info_rows, df1_aligned, changes)
+
         print(f"\n✅ Comparison complete. Saved to: {output_path}")
         
         open_file(output_path)
@@ -209,4 +199,82 @@ def compare() -> None:
     except Exception as e:
         logger.error(f"Comparison failed: {e}")
         print(f"An error occurred: {e}")
-        
\ No newline at end of file
+        
+
+
+# ==========================================
+# 3. REPORT WRITERS
+# ==========================================
+# Both produce the same three sheets: Info, Full Result (every shared row) and
+# Filtered Result (changed rows only). Rows come from File 1, with each changed
+# cell replaced by its "old → new" string and filled yellow.
+
+def write_report_xlsxwriter(output_path: str, info_rows: list, df: pd.DataFrame, changes: Dict[int, Dict[int, str]]) -> None:
+    """Writes the report with xlsxwriter, streaming rows in constant memory mode."""
+    # strings_to_urls off: cell text is written as is, never turned into hyperlinks
+    options = {"constant_memory": True, "strings_to_urls": False, "default_date_format": "yyyy-mm-dd hh:mm:ss"}
+    with xlsxwriter.Workbook(output_path, options) as workbook:
+        yellow_fill = workbook.add_format({"bg_color": "#FFFF00", "pattern": 1})
+
+        info_sheet = workbook.add_worksheet("Info")
+        for r_idx, row in enumerate(info_rows):
+            info_sheet.write_row(r_idx, 0, row)
+
+        full_sheet = workbook.add_worksheet("Full Result")
+        filtered_sheet = workbook.add_worksheet("Filtered Result")
+        full_sheet.write_row(0, 0, list(df.columns))
+        filtered_sheet.write_row(0, 0, list(df.columns))
+
+        # One pass over the rows; each sheet still receives its rows in order
+        filtered_row = 1
+        for r_idx, values in enumerate(df.itertuples(index=False, name=None)):
+            # Missing values are left as empty cells
+            values = [None if pd.isna(value) else value for value in values]
+            full_sheet.write_row(r_idx + 1, 0, values)
+
+            changed = changes.get(r_idx)
+            if not changed:
+                continue
+
+            filtered_sheet.write_row(filtered_row, 0, values)
+            for c_idx, text in changed.items():
+                full_sheet.write_string(r_idx + 1, c_idx, text, yellow_fill)
+                filtered_sheet.write_string(filtered_row, c_idx, text, yellow_fill)
+            filtered_row += 1
+
+
+def write_report_openpyxl(output_path: str, info_rows: list, df: pd.DataFrame, changes: Dict[int, Dict[int, str]]) -> None:
+    """Writes the report with a write-only openpyxl workbook (rows are streamed, not kept as Cells)."""
+    wb = Workbook(write_only=True)
+
+    # One registered style for every highlighted cell, applied by name
+    highlight = NamedStyle(name="highlight")
+    highlight.fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
+    wb.add_named_style(highlight)
+
+    def build_row(sheet, row_idx: int, values: tuple) -> list:
+        """Returns the row for append(), with changed cells swapped for filled change strings."""
+        row = list(values)
+        for c_idx, text in changes.get(row_idx, {}).items():
+            cell = WriteOnlyCell(sheet, value=text)
+            cell.style = "highlight"
+            row[c_idx] = cell
+        return row
+
+    info_sheet = wb.create_sheet("Info")
+    for row in info_rows:
+        info_sheet.append(row)
+
+    full_sheet = wb.create_sheet("Full Result")
+    full_sheet.append(list(df.columns))
+    for r_idx, values in enumerate(df.itertuples(index=False, name=None)):
+        full_sheet.append(build_row(full_sheet, r_idx, values))
+
+    filtered_sheet = wb.create_sheet("Filtered Result")
+    filtered_sheet.append(list(df.columns))
+    # Only the changed rows are pulled out for this sheet
+    changed_rows = sorted(changes)
+    for r_idx, values in zip(changed_rows, df.take(changed_rows).itertuples(index=False, name=None)):
+        filtered_sheet.append(build_row(filtered_sheet, r_idx, values))
+
+    wb.save(output_path)
@@ -7,15 +7,52 @@ import os
 import subprocess
 import platform
 import logging
+import importlib.util
+import zipfile
+import threading
+import queue
+from xml.etree import ElementTree
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional, List, Union, Dict, Any
+from typing import Optional, List, Union, Dict, Any, Tuple, Callable, TYPE_CHECKING
 
-import pandas as pd
 import customtkinter as ctk
 
+# pandas and openpyxl are imported inside the functions that use them,
+# so that importing this module (e.g., for clear_frame) stays cheap at startup
+if TYPE_CHECKING:
+    import tkinter as tk
+    import pandas as pd
+
+# Optional Rust-based Excel reader, much faster than openpyxl for reading
+try:
+    import python_calamine
+except ImportError:
+    python_calamine = None
+
 # Initialize Logger
 logger = logging.getLogger('AppLogger')
 
+# Engine used by pd.read_excel (openpyxl is kept for writing)
+EXCEL_ENGINE = "calamine" if python_calamine else "openpyxl"
+
+# Extra pd.read_excel arguments: Arrow-backed columns when pyarrow is installed
+# (compact strings, compiled string/groupby/merge kernels)
+READ_OPTIONS = {"dtype_backend": "pyarrow"} if importlib.util.find_spec("pyarrow") else {}
+
+# Interval (ms) at which the Tk thread checks for a worker thread's result
+WORKER_POLL_MS = 50
+
+# Top rows of recently probed sheets, keyed by (file_path, sheet_name).
+# Only values are kept, workbooks are closed right after reading, so the
+# files stay free to be saved in Excel. Entries hold the file's mtime so
+# an edited file is read again.
+_ROWS_CACHE: "OrderedDict[Tuple[str, str], Tuple[float, List[tuple], int]]" = OrderedDict()
+_ROWS_CACHE_SIZE = 8
+
+# Rows read per probe (covers the auto_header_finder scan)
+PROBE_ROWS = 20
+
 # ==========================================
 # 2. GUI UTILITIES
 # ==========================================
@@ -55,38 +92,221 @@ def extract_date(filename: str) -> Optional[datetime]:
     return None
 
 
+# Characters Excel rejects in sheet names, each mapped to '_'
+_SHEET_NAME_TABLE = str.maketrans({char: '_' for char in '/\\?*[]:'})
+
 def clean_sheet_name(string: str) -> str:
     """Sanitizes a string to make it a valid Excel sheet name."""
-    invalid_chars = ['/', '\\', '?', '*', '[', ']', ':']
-    for char in invalid_chars:
-        string = string.replace(char, '_') 
-    
     # Excel sheet names are limited to 31 chars
-    return string[:31]
+    return string.translate(_SHEET_NAME_TABLE)[:31]
 
 
 # ==========================================
 # 4. DATAFRAME UTILITIES
 # ==========================================
 
+def fast_sheet_names(file_path: str) -> List[str]:
+    """
+    Lists the sheet names of a workbook without loading it.
+    For .xlsx files only 'xl/workbook.xml' is read from the zip archive,
+    other formats (e.g., .xls) fall back to calamine. Without calamine,
+    read-only openpyxl is tried before pandas.
+    """
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            with archive.open("xl/workbook.xml") as workbook_xml:
+                return [
+                    element.get("name")
+                    for _, element in ElementTree.iterparse(workbook_xml)
+                    if element.tag.rsplit("}", 1)[-1] == "sheet"
+                ]
+    except (zipfile.BadZipFile, KeyError):
+        if python_calamine:
+            return python_calamine.CalamineWorkbook.from_path(file_path).sheet_names
+
+        # Zip based workbooks with an unusual layout: openpyxl in read-only
+        # mode lists sheets without loading cells or styles
+        if zipfile.is_zipfile(file_path):
+            import openpyxl
+
+            workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+            try:
+                return workbook.sheetnames
+            finally:
+                workbook.close()
+
+        import pandas as pd
+
+        logger.info(f"Falling back to pandas to list sheets of {file_path}")
+        with pd.ExcelFile(file_path) as excel_file:
+            return excel_file.sheet_names
+
+
+def run_in_background(widget: "tk.Misc",
+                      task: Callable[[], Any],
+                      on_done: Callable[[Any], None],
+                      on_error: Callable[[Exception], None]) -> None:
+    """
+    Runs 'task' on a worker thread. The worker never touches Tk: its result
+    (or exception) goes through a queue that 'widget' polls, so 'on_done' /
+    'on_error' run on the Tk thread. Any widget works (CTk or plain Tk);
+    nothing is delivered if it is destroyed first.
+    """
+    results: "queue.Queue[Tuple[bool, Any]]" = queue.Queue(maxsize=1)
+
+    def worker() -> None:
+        try:
+            results.put((True, task()))
+        except Exception as e:
+            results.put((False, e))
+
+    def poll() -> None:
+        # The widget is gone if the user switched to another service
+        if not widget.winfo_exists():
+            return
+
+        try:
+            succeeded, result = results.get_nowait()
+        except queue.Empty:
+            widget.after(WORKER_POLL_MS, poll)
+            return
+
+        if succeeded:
+            on_done(result)
+        else:
+            on_error(result)
+
+    threading.Thread(target=worker, daemon=True).start()
+    widget.after(WORKER_POLL_MS, poll)
+
+
+def load_sheet_names_async(widget: ctk.CTkBaseClass, file_path: str, callback: Callable[[List[str]], None]) -> None:
+    """
+    Lists the sheet names of a workbook on a worker thread, then passes
+    them to 'callback' on the Tk thread so the UI stays responsive.
+    """
+    def on_error(e: Exception) -> None:
+        logger.error(f"Failed to load file {file_path}: {e}")
+        print(f"Error loading file: {e}")
+
+    run_in_background(widget, lambda: fast_sheet_names(file_path), callback, on_error)
+
+
+def read_top_rows(file_path: str, sheet_name: str, count: int = PROBE_ROWS) -> List[tuple]:
+    """
+    Returns the values of the first 'count' rows of a sheet.
+    Rows are cached while the file is unchanged, so the header probe and the
+    header read of one selection open the workbook only once.
+    Formulas, styles and external links are skipped.
+    """
+    key = (file_path, sheet_name)
+    mtime = os.path.getmtime(file_path)
+    cached = _ROWS_CACHE.get(key)
+
+    if cached is not None:
+        cached_mtime, rows, limit = cached
+
+        # Enough rows were read, or the sheet ended before the last read's limit
+        if cached_mtime == mtime and (count <= limit or len(rows) < limit):
+            _ROWS_CACHE.move_to_end(key)
+            return rows[:count]
+
+    import openpyxl
+
+    limit = max(count, PROBE_ROWS)
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        rows = list(workbook[sheet_name].iter_rows(max_row=limit, values_only=True))
+    finally:
+        # Release the file handle right away
+        workbook.close()
+
+    _ROWS_CACHE[key] = (mtime, rows, limit)
+
+    # Forget the least recently used sheet
+    while len(_ROWS_CACHE) > _ROWS_CACHE_SIZE:
+        _ROWS_CACHE.popitem(last=False)
+
+    return rows[:count]
+
+
+def read_header_only(file_path: str, sheet_name: str, header_row: int = 0) -> List[Any]:
+    """
+    Returns the column labels found on 'header_row' (0-based) of a sheet,
+    named the way pd.read_excel names them, so they match the DataFrame columns.
+    Only the top rows are read, no DataFrame is built.
+    """
+    rows = read_top_rows(file_path, sheet_name, header_row + 1)
+    header = list(rows[header_row]) if len(rows) > header_row else []
+
+    # Trailing empty cells are not columns (unless data sits below them,
+    # which the header row alone cannot tell)
+    while header and header[-1] in (None, ""):
+        header.pop()
+
+    # Blank headers become 'Unnamed: N', whole floats become ints
+    labels = [
+        f"Unnamed: {i}" if value in (None, "")
+        else int(value) if isinstance(value, float) and value.is_integer()
+        else value
+        for i, value in enumerate(header)
+    ]
+    unnamed = [i for i, value in enumerate(header) if value in (None, "")]
+
+    # Duplicates get '.1', '.2', ... suffixes, named columns are numbered first
+    counts: Dict[Any, int] = {}
+    for i in [i for i in range(len(labels)) if i not in unnamed] + unnamed:
+        label = original = labels[i]
+        count = counts.get(label, 0)
+
+        while count > 0:
+            counts[original] = count + 1
+            label = f"{original}.{count}"
+            count = count + 1 if label in labels else counts.get(label, 0)
+
+        labels[i] = label
+        counts[label] = count + 1
+
+    return labels
+
+
+def release_workbooks(keep: Optional[List[str]] = None) -> None:
+    """Forgets the cached rows of every workbook, except the ones listed in 'keep'."""
+    keep = set(keep or [])
+
+    for key in list(_ROWS_CACHE):
+        if key[0] not in keep:
+            del _ROWS_CACHE[key]
+
+
+def match_columns(columns: "pd.Index", names: List[Any]) -> List[Any]:
+    """
+    Maps column names stored in the config back to DataFrame labels.
+    The config holds text only (JSON keeps no label types), so a stored
+    '2024' is matched to the label 2024. An exact match always wins and
+    unknown names are returned unchanged.
+    """
+    by_text: Dict[str, Any] = {}
+    for col in columns:
+        by_text.setdefault(str(col), col)
+
+    return [name if name in columns else by_text.get(str(name), name) for name in names]
+
+
 def auto_header_finder(file_data: Dict[str, Any], column_name: str = "ID") -> int:
     """
     Scans the first few rows of an Excel sheet to find the header row 
     by looking for a specific column name (e.g., 'ID', 'Unique Key').
+    Rows come from read_top_rows, no DataFrame is built.
     """
     try:
-        # Read headerless to scan rows
-        excel1 = pd.read_excel(
-            file_data["file_path"], 
-            sheet_name=file_data["sheet_name"], 
-            header=None,
-            nrows=20 # Limit scan to first 20 rows for efficiency
-        )
+        # Limit scan to first 20 rows for efficiency
+        rows = read_top_rows(file_data["file_path"], file_data["sheet_name"], PROBE_ROWS)
 
         # Loop through the rows to find the anchor column
-        for i, row in excel1.iterrows():
+        for i, row in enumerate(rows):
             # Convert row to string to ensure safe search
-            row_values = [str(val).strip() for val in row.values]
+            row_values = [str(val).strip() for val in row]
             
             if column_name in row_values:
                 logger.info(f"Header found at row {i}")
@@ -101,28 +321,30 @@ def auto_header_finder(file_data: Dict[str, Any], column_name: str = "ID") -> in
         return 0
 
 
-def dolarize(series: pd.Series) -> List[str]:
+def dolarize(series: "pd.Series") -> List[str]:
     """
     Formats a numeric series into US Dollar strings (e.g., $1,234).
     Avoids using 'locale' library to prevent global environment side effects.
     """
-    formatted_list = []
-    
-    for amount in series:
-        try:
-            val = float(amount)
-            # Format with commas and no decimals
-            formatted = "${:,.0f}".format(abs(val))
-            
-            if val < 0:
-                formatted = f"-{formatted}"
-                
-            formatted_list.append(formatted)
-        except (ValueError, TypeError):
-            # If not a number, return as is
-            formatted_list.append(str(amount))
-            
-    return formatted_list
+    import numpy as np
+    import pandas as pd
+
+    values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+
+    # Format with commas and no decimals, sign in front of the '$'
+    # (a NaN float comes out as '$nan', as float() formatting always gave)
+    formatted = pd.Series(np.abs(values), dtype=float).map("${:,.0f}".format).to_numpy(dtype=object)
+    negative = values < 0
+    formatted[negative] = "-" + formatted[negative]
+
+    # If not a number, return as is. Only the entries that failed to convert
+    # are inspected, to tell NaN floats apart from text, None or pd.NA.
+    for i in np.flatnonzero(np.isnan(values)):
+        value = series.iat[i]
+        if not isinstance(value, float):
+            formatted[i] = str(value)
+
+    return formatted.tolist()
 
 
 # ==========================================
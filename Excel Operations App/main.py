@@ -10,7 +10,7 @@ import warnings
 import customtkinter as ctk
 
 # Local Modules
-from _config.settings import load_config, terminate_program
+from _config.settings import load_config, set_flush_scheduler, terminate_program
 from _gui.layout import setup_default_layout
 
 # Suppress specific warnings
@@ -28,8 +28,7 @@ original_stdout = sys.stdout
 original_stderr = sys.stderr
 
 # Configure logging
-if not os.path.exists("outputs"):
-    os.makedirs("outputs")
+os.makedirs("outputs", exist_ok=True)
 
 with open("outputs/app.log", "w"):
     pass
@@ -55,6 +54,9 @@ app.geometry("920x520")
 
 # Icon setup
 app.iconbitmap("inputs/Microsoft.ico")
+
+# Write config changes from the Tk event loop
+set_flush_scheduler(app.after)
     
 ctk.set_appearance_mode("dark")
 